@@ -1,10 +1,9 @@
+import logging
 from flask import Flask
 from flask_cors import CORS
-from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from dotenv import load_dotenv
 import os
-from pymongo import MongoClient
 from datetime import timedelta
 
 # Import route modules
@@ -15,27 +14,56 @@ from routes.case_routes import case_bp  # Add the new case routes
 from routes.lawyer_case_routes import lawyer_case_bp  # New lawyer case routes
 from routes.test_routes import test_bp  # Import test routes
 from routes.document_routes import document_bp  # Import document routes
+from routes.event_routes import event_bp  # Server-sent case events
+from commands import register_commands
+from utils.token_blocklist import revoked_token_cache
+from utils.auth import user_cache
+from utils.json_provider import MongoJSONProvider
+from utils.compression import init_compression
+from utils.metrics import init_metrics
 
-
+logger = logging.getLogger(__name__)
 
 # Load environment variables
 load_dotenv()
 
 def create_app():
+    # Log to stderr (gunicorn passes it on); warnings and errors are also counted in /metrics
+    logging.basicConfig(
+        level=os.getenv("LOG_LEVEL", "INFO").upper(),
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+
     # Initialize Flask app
     app = Flask(__name__)
+    # Encode ObjectId/datetime directly (and with orjson when installed)
+    app.json = MongoJSONProvider(app)
     CORS(app)
     
     # Configure JWT
     app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "your-secret-key")
     app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(hours=1)
     app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=30)
+    # Upper bound, in seconds, for a logout on one worker to reach the others
+    app.config["JWT_REVOCATION_POLL_SECONDS"] = float(os.getenv("JWT_REVOCATION_POLL_SECONDS", "5"))
+
+    # Tokens come in the Authorization header. Only document downloads and
+    # the event stream also accept ?jwt=<token> (QUERY_TOKEN_LOCATIONS in
+    # utils/auth.py), since links and EventSource cannot set headers.
+    app.config["JWT_TOKEN_LOCATION"] = ["headers"]
 
     app.config["MAX_CONTENT_LENGTH"] = 10 * 1024 * 1024
+
+    # JSON responses at least this large are sent gzip/brotli compressed
+    app.config["COMPRESSION_MIN_BYTES"] = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+
+    # Document downloads: "" streams from Python, "x-accel-redirect" (nginx)
+    # or "x-sendfile" (Apache/lighttpd) hand the file to the front proxy
+    app.config["DOCUMENT_SENDFILE_MODE"] = os.getenv("DOCUMENT_SENDFILE_MODE", "")
+    app.config["DOCUMENT_ACCEL_PREFIX"] = os.getenv("DOCUMENT_ACCEL_PREFIX", "/protected-uploads")
     
     # Initialize extensions
     jwt = JWTManager(app)
-    bcrypt = Bcrypt(app)
     
     # Register blueprints
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -45,24 +73,57 @@ def create_app():
     app.register_blueprint(lawyer_case_bp, url_prefix='/api/lawyer/cases')  # New lawyer case routes
     app.register_blueprint(test_bp, url_prefix='/api/test')  # Register test routes
     app.register_blueprint(document_bp, url_prefix='/api/documents')  # Register document routes
+    app.register_blueprint(event_bp, url_prefix='/api/events')  # Server-sent case events
+
+    # Per-route latency, status and size, MongoDB commands per request and
+    # GET /metrics; registered before compression so sizes are compressed sizes
+    init_metrics(app)
+
+    # Compress large JSON responses
+    init_compression(app)
+
+    # Register CLI commands (flask ensure-indexes, ...)
+    register_commands(app)
+
+    # Optionally create the MongoDB indexes when the app starts
+    if os.getenv("ENSURE_INDEXES_ON_STARTUP", "false").lower() == "true":
+        from database.db import get_db
+        from database.indexes import ensure_indexes
+        try:
+            ensure_indexes(get_db())
+        except Exception:
+            logger.exception("Error creating indexes")
     
     
     # Configure JWT error handlers
+    revoked_token_cache.configure(
+        poll_interval=app.config["JWT_REVOCATION_POLL_SECONDS"],
+        max_token_lifetime=max(app.config["JWT_ACCESS_TOKEN_EXPIRES"], app.config["JWT_REFRESH_TOKEN_EXPIRES"])
+    )
+
+    # How long role/name lookups for the current user are cached per worker
+    user_cache.ttl = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload):
         from database.db import get_db
         jti = jwt_payload["jti"]
-        token = get_db().revoked_tokens.find_one({"jti": jti})
-        return token is not None
+        return revoked_token_cache.is_revoked(get_db(), jti)
     
     @app.errorhandler(422)
     def handle_unprocessable_entity(e):
         # Log the error for debugging
-        print(f"JWT Error: {str(e)}")
+        logger.warning("JWT Error: %s", e)
         return {"msg": "Token validation failed"}, 422
     
     return app
 
 if __name__ == "__main__":
+    # Development server only; production runs wsgi.py under gunicorn
+    # (see gunicorn.conf.py) or serve_async.py
     app = create_app()
-    app.run("0.0.0.0",debug=True)
+    app.run(
+        os.getenv("HOST", "0.0.0.0"),
+        int(os.getenv("PORT", "5000")),
+        debug=os.getenv("FLASK_DEBUG", "false").lower() == "true"
+    )
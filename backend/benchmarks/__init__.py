@@ -0,0 +1,2 @@
+# benchmarks/__init__.py
+# Empty file to make the directory a Python package
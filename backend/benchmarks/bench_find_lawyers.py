@@ -0,0 +1,115 @@
+# benchmarks/bench_find_lawyers.py
+"""
+Lawyer directory benchmark: seed a scratch database with generated
+lawyers, create the directory indexes and time search_lawyers() pages
+with and without filters. Each query shape is also explained to confirm
+it is answered by an index scan without an in-memory sort.
+
+Needs a running MongoDB (MONGO_URI); the scratch database is dropped
+afterwards. Exits non-zero if a median exceeds --max-ms.
+
+Usage (from backend/):
+    python -m benchmarks.bench_find_lawyers --lawyers 5000 --max-ms 10
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from database.db import get_client
+from database.indexes import INDEX_SPECS, _plan_stages
+from database.lawyers import search_lawyers, DIRECTORY_SORT, PROFILE_DEFAULTS
+from utils.gemini_classifier import CASE_CATEGORIES
+
+SCRATCH_DB = "bench_lawyer_directory"
+
+QUERIES = {
+    "all": {},
+    "specialization": {"specialization": "family"},
+    "specialization + rating": {"specialization": "family", "min_rating": 4.0},
+    "workload + experience": {"max_open_cases": 2, "min_experience": 5}
+}
+
+
+def seed(db, count, rng):
+    lawyers = []
+    for i in range(count):
+        lawyers.append(dict(
+            PROFILE_DEFAULTS,
+            firstName="Lawyer",
+            lastName=str(i),
+            email=f"lawyer{i}@example.com",
+            userType="lawyer",
+            roles=["lawyer"],
+            specializations=rng.sample(CASE_CATEGORIES, rng.randint(1, 3)),
+            experience=rng.randint(0, 40),
+            rating=round(rng.uniform(1, 5), 1),
+            openCaseCount=rng.randint(0, 20)
+        ))
+    db.users.insert_many(lawyers)
+    for keys, options in INDEX_SPECS["users"]:
+        db.users.create_index(keys, **options)
+
+
+def query_for(filters):
+    """The filter search_lawyers builds, for explain()."""
+    query = {"userType": "lawyer"}
+    if "specialization" in filters:
+        query["specializations"] = filters["specialization"]
+    if "min_rating" in filters:
+        query["rating"] = {"$gte": filters["min_rating"]}
+    if "max_open_cases" in filters:
+        query["openCaseCount"] = {"$lte": filters["max_open_cases"]}
+    if "min_experience" in filters:
+        query["experience"] = {"$gte": filters["min_experience"]}
+    return query
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lawyers", type=int, default=5000)
+    parser.add_argument("--limit", type=int, default=25, help="Page size")
+    parser.add_argument("--repeat", type=int, default=100)
+    parser.add_argument("--max-ms", type=float, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    client = get_client()
+    client.drop_database(SCRATCH_DB)
+    db = client[SCRATCH_DB]
+    failed = False
+    try:
+        seed(db, args.lawyers, random.Random(args.seed))
+        print(f"{args.lawyers} lawyers, pages of {args.limit}, median of {args.repeat} runs")
+
+        for name, filters in QUERIES.items():
+            timings = []
+            cursor = None
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                _, next_token = search_lawyers(db, args.limit, cursor=cursor, **filters)
+                timings.append((time.perf_counter() - start) * 1000)
+                # Walk forward through the pages, starting over at the end
+                cursor = next_token
+
+            plan = db.users.find(query_for(filters)).sort(DIRECTORY_SORT).limit(args.limit + 1).explain()
+            stages = set(_plan_stages(plan.get("queryPlanner", {}).get("winningPlan", {})))
+            median = statistics.median(timings)
+            notes = []
+            if "COLLSCAN" in stages:
+                notes.append("COLLSCAN")
+            if "SORT" in stages:
+                notes.append("in-memory SORT")
+            print(f"  {name:<24} median {median:6.2f} ms  p95 {sorted(timings)[int(len(timings) * 0.95) - 1]:6.2f} ms"
+                  + (f"  [{', '.join(notes)}]" if notes else ""))
+            if median > args.max_ms or "COLLSCAN" in stages:
+                failed = True
+    finally:
+        client.drop_database(SCRATCH_DB)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
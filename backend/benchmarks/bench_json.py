@@ -0,0 +1,105 @@
+# benchmarks/bench_json.py
+"""
+JSON encoding benchmark for list responses: the old serialize_doc pass
+(now database.db.to_jsonable) followed by Flask's default provider,
+against utils.json_provider.MongoJSONProvider encoding the documents
+as they come from pymongo.
+
+Case documents are generated to look like /client/cases and
+/assigned-cases pages, with ObjectIds, datetimes, documents and comments.
+Both encodings are checked to decode to the same data.
+
+Usage (from backend/):
+    python -m benchmarks.bench_json --cases 100 --repeat 200
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+from bson.objectid import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from database.db import to_jsonable
+from utils.json_provider import MongoJSONProvider, orjson
+
+STATUSES = ["Pending", "Assigned", "InProgress", "OnHold", "Closed"]
+CATEGORIES = ["civil", "criminal", "family", "corporate", "property"]
+WORDS = ("tenant landlord contract dispute deposit notice court hearing employer "
+         "wages custody agreement property boundary claim damages insurance").split()
+
+
+def make_case(rng, now):
+    created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+    return {
+        "_id": ObjectId(),
+        "title": " ".join(rng.choices(WORDS, k=6)).capitalize(),
+        "description": " ".join(rng.choices(WORDS, k=50)),
+        "category": rng.choice(CATEGORIES),
+        "urgencyLevel": rng.choice(["Low", "Medium", "High"]),
+        "communicationMethod": "email",
+        "clientId": ObjectId(),
+        "clientName": "Jane Client",
+        "assignedLawyer": {"name": "John Lawyer", "id": str(ObjectId())},
+        "status": rng.choice(STATUSES),
+        "aiClassified": rng.random() < 0.5,
+        "created_at": created,
+        "updated_at": created + timedelta(hours=rng.randint(0, 48)),
+        "documents": [
+            {"filename": f"evidence-{i}.pdf", "sha256": "%064x" % rng.getrandbits(256),
+             "size": rng.randint(10_000, 5_000_000), "uploadedAt": created}
+            for i in range(rng.randint(0, 3))
+        ],
+        "comments": [
+            {"userId": ObjectId(), "userType": "lawyer",
+             "text": " ".join(rng.choices(WORDS, k=15)), "timestamp": created + timedelta(hours=i)}
+            for i in range(rng.randint(0, 5))
+        ]
+    }
+
+
+def time_it(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cases", type=int, default=100, help="Cases per response")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    payload = {"cases": [make_case(rng, now) for _ in range(args.cases)], "next": None}
+
+    app = Flask(__name__)
+    legacy = DefaultJSONProvider(app)
+    provider = MongoJSONProvider(app)
+
+    def old():
+        return legacy.response(to_jsonable(payload)).get_data()
+
+    def new():
+        return provider.response(payload).get_data()
+
+    with app.app_context():
+        if json.loads(old()) != json.loads(new()):
+            raise SystemExit("Encodings differ")
+        old_ms = time_it(old, args.repeat)
+        new_ms = time_it(new, args.repeat)
+
+    encoder = "orjson" if orjson is not None else "json"
+    print(f"{args.cases} cases per response, median of {args.repeat} runs")
+    print(f"  to_jsonable + DefaultJSONProvider: {old_ms:.2f} ms")
+    print(f"  MongoJSONProvider ({encoder}):      {new_ms:.2f} ms  ({old_ms / new_ms:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# benchmarks/bench_local_classifier.py
+"""
+Offline accuracy and latency benchmark for the local classifier.
+
+Labelled cases come from a JSON Lines file of {"description", "category"}
+objects, or from db.cases when no file is given. A random holdout is used
+for evaluation; nothing here calls Gemini.
+
+Usage (from backend/):
+    python -m benchmarks.bench_local_classifier --data cases.jsonl
+    python -m benchmarks.bench_local_classifier --threshold 0.8
+"""
+import argparse
+import json
+import random
+import time
+import numpy as np
+from utils.gemini_classifier import CASE_CATEGORIES
+from utils.local_classifier import LocalClassifier, load_training_data, CONFIDENCE_THRESHOLD
+
+
+def load_labelled(path):
+    if path:
+        texts, labels = [], []
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    row = json.loads(line)
+                    texts.append(row["description"])
+                    labels.append(row["category"])
+        return texts, labels
+
+    from database.db import get_db
+    return load_training_data(get_db(), CASE_CATEGORIES)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", help="JSON Lines file of labelled descriptions (default: db.cases)")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for evaluation")
+    parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    texts, labels = load_labelled(args.data)
+    if len(texts) < 10:
+        raise SystemExit(f"Need at least 10 labelled descriptions, found {len(texts)}")
+
+    rows = list(zip(texts, labels))
+    random.Random(args.seed).shuffle(rows)
+    split = max(1, int(len(rows) * args.holdout))
+    test, train = rows[:split], rows[split:]
+
+    start = time.perf_counter()
+    model = LocalClassifier.train([t for t, _ in train], [l for _, l in train])
+    train_seconds = time.perf_counter() - start
+
+    latencies = []
+    correct = confident = confident_correct = 0
+    for text, label in test:
+        start = time.perf_counter()
+        category, probability = model.predict(text)
+        latencies.append(time.perf_counter() - start)
+        correct += category == label
+        if probability >= args.threshold:
+            confident += 1
+            confident_correct += category == label
+
+    latencies_us = np.array(latencies) * 1e6
+    print(f"train: {len(train)} cases, {len(model.vocabulary)} terms, {train_seconds:.2f}s")
+    print(f"test:  {len(test)} cases")
+    print(f"accuracy (all):        {correct / len(test):.3f}")
+    print(f"coverage @ {args.threshold:.2f}:       {confident / len(test):.3f} (answered without Gemini)")
+    if confident:
+        print(f"accuracy @ {args.threshold:.2f}:       {confident_correct / confident:.3f}")
+    print(f"latency p50/p99/max:   {np.percentile(latencies_us, 50):.0f} / "
+          f"{np.percentile(latencies_us, 99):.0f} / {latencies_us.max():.0f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+# benchmarks/bench_login_storm.py
+"""
+Login storm benchmark: start the app under gunicorn (one gthread worker),
+measure GET /api/auth/me latency on its own, then again while a burst of
+clients logs in as fast as it can.
+
+The storm is run twice: with bcrypt on the request threads
+(PASSWORD_HASH_WORKERS=0) and with the process pool
+(PASSWORD_HASH_WORKERS=--hash-workers). With the pool, /me should keep
+close to its idle latency and logins beyond PASSWORD_HASH_MAX_PENDING are
+refused with 503 instead of queueing.
+
+Needs a running MongoDB (MONGO_URI); the scratch database is dropped
+afterwards. Exits non-zero if /me's p95 during the pooled storm exceeds
+--max-ms.
+
+Usage (from backend/):
+    python -m benchmarks.bench_login_storm --clients 32 --seconds 10 --max-ms 50
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import requests
+from pymongo import MongoClient, uri_parser
+
+SCRATCH_DB = "bench_login_storm"
+PASSWORD = "storm-password"
+
+
+def scratch_uri(uri):
+    """MONGO_URI pointed at SCRATCH_DB."""
+    parsed = uri_parser.parse_uri(uri)
+    base, _, query = uri.partition("?")
+    if parsed["database"]:
+        base = base[:base.rindex("/")]
+    return f"{base.rstrip('/')}/{SCRATCH_DB}" + (f"?{query}" if query else "")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(args, hash_workers, mongo_uri):
+    port = free_port()
+    env = dict(
+        os.environ,
+        MONGO_URI=mongo_uri,
+        PASSWORD_HASH_WORKERS=str(hash_workers),
+        BCRYPT_LOG_ROUNDS=str(args.rounds),
+        WEB_CONCURRENCY="1",
+        GUNICORN_WORKER_CLASS="gthread",
+        GUNICORN_THREADS=str(args.threads),
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        CLASSIFIER_WORKERS="0"
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", args.app],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    for _ in range(100):
+        try:
+            requests.get(f"{base_url}/api/auth/me", timeout=1)
+            return process, base_url
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    process.kill()
+    raise SystemExit("Server did not start")
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[max(0, int(len(ordered) * fraction) - 1)]
+
+
+def probe(base_url, token, stop, timings):
+    """Time /me requests one after another until `stop` is set."""
+    session = requests.Session()
+    headers = {"Authorization": f"Bearer {token}"}
+    while not stop.is_set():
+        start = time.perf_counter()
+        session.get(f"{base_url}/api/auth/me", headers=headers, timeout=30)
+        timings.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.01)
+
+
+def storm(base_url, stop, counts, lock):
+    session = requests.Session()
+    while not stop.is_set():
+        response = session.post(
+            f"{base_url}/api/auth/login",
+            json={"email": "storm@example.com", "password": PASSWORD},
+            timeout=60
+        )
+        with lock:
+            counts[response.status_code] = counts.get(response.status_code, 0) + 1
+
+
+def run(args, hash_workers, mongo_uri):
+    process, base_url = start_server(args, hash_workers, mongo_uri)
+    try:
+        requests.post(f"{base_url}/api/auth/signup", json={
+            "email": "storm@example.com", "password": PASSWORD,
+            "firstName": "Storm", "lastName": "Client", "userType": "client"
+        }, timeout=60)
+        token = requests.post(f"{base_url}/api/auth/login", json={
+            "email": "storm@example.com", "password": PASSWORD
+        }, timeout=60).json()["access_token"]
+
+        # /me on its own
+        idle, stop = [], threading.Event()
+        prober = threading.Thread(target=probe, args=(base_url, token, stop, idle))
+        prober.start()
+        time.sleep(min(3, args.seconds))
+        stop.set()
+        prober.join()
+
+        # /me during the storm
+        busy, counts, lock, stop = [], {}, threading.Lock(), threading.Event()
+        clients = [threading.Thread(target=storm, args=(base_url, stop, counts, lock)) for _ in range(args.clients)]
+        prober = threading.Thread(target=probe, args=(base_url, token, stop, busy))
+        for thread in clients + [prober]:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in clients + [prober]:
+            thread.join()
+    finally:
+        process.terminate()
+        process.wait()
+
+    label = "inline bcrypt" if hash_workers == 0 else f"pool of {hash_workers}"
+    print(f"  {label:<14} /me idle p50 {statistics.median(idle):6.1f} ms  "
+          f"storm p50 {statistics.median(busy):7.1f} ms  p95 {percentile(busy, 0.95):7.1f} ms  "
+          f"logins/s {counts.get(200, 0) / args.seconds:6.1f}  503s {counts.get(503, 0)}")
+    return percentile(busy, 0.95)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent login loops")
+    parser.add_argument("--seconds", type=float, default=10, help="Length of each storm")
+    parser.add_argument("--threads", type=int, default=8, help="Request threads in the worker")
+    parser.add_argument("--hash-workers", type=int, default=2)
+    parser.add_argument("--rounds", type=int, default=12, help="BCRYPT_LOG_ROUNDS")
+    parser.add_argument("--max-ms", type=float, default=50, help="Fail if /me p95 under the pooled storm exceeds this")
+    parser.add_argument("--app", default="wsgi:app", help="WSGI app for gunicorn")
+    args = parser.parse_args()
+
+    mongo_uri = scratch_uri(os.getenv("MONGO_URI", "mongodb://localhost:27017/legal_app"))
+    client = MongoClient(mongo_uri)
+    print(f"{args.clients} clients logging in for {args.seconds:.0f} s against {args.threads} request threads, "
+          f"bcrypt cost {args.rounds}")
+    try:
+        for hash_workers in (0, args.hash_workers):
+            client.drop_database(SCRATCH_DB)
+            pooled_p95 = run(args, hash_workers, mongo_uri)
+    finally:
+        client.drop_database(SCRATCH_DB)
+
+    if pooled_p95 > args.max_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
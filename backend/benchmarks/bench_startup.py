@@ -0,0 +1,70 @@
+# benchmarks/bench_startup.py
+"""
+Cold-start benchmark: time `from app import create_app; create_app()` in
+fresh interpreters, the way a gunicorn worker boots.
+
+MONGO_URI points at an unroutable address, so the run also proves that
+startup does no database or Gemini I/O. Exits non-zero if the median
+exceeds --max-ms.
+
+Usage (from backend/):
+    python -m benchmarks.bench_startup --runs 10 --max-ms 1500
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+BOOT_SNIPPET = (
+    "import time; start = time.perf_counter(); "
+    "from app import create_app; create_app(); "
+    "print((time.perf_counter() - start) * 1000)"
+)
+
+# Modules that must not be imported while the app boots
+LAZY_MODULES = ["google.generativeai", "grpc", "numpy"]
+
+
+def boot_once(env):
+    result = subprocess.run(
+        [sys.executable, "-c", BOOT_SNIPPET],
+        capture_output=True, text=True, env=env, timeout=60
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"App failed to start:\n{result.stderr}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def eagerly_imported(env):
+    """Return the LAZY_MODULES that create_app() imports anyway."""
+    check = "from app import create_app; create_app(); import sys; print(' '.join(sys.modules))"
+    result = subprocess.run([sys.executable, "-c", check], capture_output=True, text=True, env=env, timeout=60)
+    loaded = set(result.stdout.split())
+    return [name for name in LAZY_MODULES if name in loaded]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-ms", type=float, default=1500, help="Fail if the median boot time exceeds this")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env["MONGO_URI"] = "mongodb://10.255.255.1:27017/legal_app"
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+
+    timings = [boot_once(env) for _ in range(args.runs)]
+    median = statistics.median(timings)
+    print(f"create_app() cold start over {args.runs} runs: "
+          f"median {median:.0f} ms, min {min(timings):.0f} ms, max {max(timings):.0f} ms")
+
+    eager = eagerly_imported(env)
+    if eager:
+        print("Imported at startup but should be lazy: " + ", ".join(eager))
+    if eager or median > args.max_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
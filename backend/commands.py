@@ -0,0 +1,157 @@
+# commands.py
+import threading
+import click
+from database.db import get_db
+from database.indexes import ensure_indexes, find_collection_scans
+from database.counters import apply_counter_updates, category_change_updates, rebuild_counters
+from database.lawyers import ensure_profile_defaults
+
+
+def register_commands(app):
+    """Attach the maintenance CLI commands to the Flask app."""
+
+    @app.cli.command("ensure-indexes")
+    def ensure_indexes_command():
+        """Create the MongoDB indexes and check route query plans."""
+        failures = ensure_indexes(get_db())
+        if failures:
+            raise click.ClickException(f"{len(failures)} index(es) could not be created")
+        click.echo("Indexes are up to date")
+
+        offenders = find_collection_scans(get_db())
+        if offenders:
+            raise click.ClickException(
+                "Queries falling back to a collection scan: " + ", ".join(offenders)
+            )
+        click.echo("All route queries use an index")
+
+    @app.cli.command("classification-worker")
+    @click.option("--threads", default=2, show_default=True, help="Number of worker threads")
+    def classification_worker_command(threads):
+        """Run a dedicated worker for queued case classifications."""
+        from utils.classification_jobs import ClassificationWorkerPool
+        pool = ClassificationWorkerPool(threads)
+        pool.start()
+        click.echo(f"Classification worker running with {threads} thread(s), Ctrl+C to stop")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pool.stop()
+
+    @app.cli.command("backfill-classification")
+    @click.option("--page-size", default=500, show_default=True, help="Cases fetched per page")
+    @click.option("--force", is_flag=True, help="Also reclassify cases already on the current prompt version")
+    def backfill_classification_command(page_size, force):
+        """
+        Reclassify AI-classified cases with a stale prompt version.
+
+        Cases labelled by the local model do not depend on the prompt and
+        are only included with --force. updated_at is left alone, so the
+        backfill does not reorder case lists; the cases' list version is
+        bumped instead so list ETags still change with the categories.
+        """
+        from pymongo import UpdateOne
+        from utils.gemini_classifier import classify_cases_batch_with_sources, PROMPT_VERSION
+        from utils.classification_jobs import classification_update
+        from utils.http_cache import bump_list_version
+
+        db = get_db()
+        query = {"aiClassified": True}
+        if not force:
+            query["classificationPromptVersion"] = {"$ne": PROMPT_VERSION}
+            query["classificationSource"] = {"$ne": "local"}
+
+        last_id = None
+        updated = failed = 0
+        while True:
+            page_query = dict(query, _id={"$gt": last_id}) if last_id else query
+            cases = list(
+                db.cases.find(page_query, {"description": 1, "category": 1, "clientId": 1, "assignedLawyer": 1})
+                .sort("_id", 1)
+                .limit(page_size)
+            )
+            if not cases:
+                break
+            last_id = cases[-1]["_id"]
+
+            results = classify_cases_batch_with_sources([case.get("description", "") for case in cases])
+            categories = [category for category, _ in results]
+            operations = [
+                UpdateOne({"_id": case["_id"]}, classification_update(category, source))
+                for case, (category, source) in zip(cases, results) if category
+            ]
+            if operations:
+                db.cases.bulk_write(operations, ordered=False)
+                bump_list_version(db.cases)
+                apply_counter_updates(db, [
+                    update
+                    for case, category in zip(cases, categories) if category
+                    for update in category_change_updates(case, case.get("category"), category)
+                ])
+            updated += len(operations)
+            failed += len(cases) - len(operations)
+            click.echo(f"Reclassified {updated} case(s), {failed} failed")
+
+        click.echo(f"Done: {updated} case(s) reclassified, {failed} failed")
+
+    @app.cli.command("train-local-classifier")
+    @click.option("--min-examples", default=50, show_default=True, help="Refuse to train on fewer labelled cases")
+    def train_local_classifier_command(min_examples):
+        """Train the offline classifier on already-categorized cases."""
+        from utils.gemini_classifier import CASE_CATEGORIES
+        from utils.local_classifier import LocalClassifier, load_training_data, MODEL_PATH
+
+        texts, labels = load_training_data(get_db(), CASE_CATEGORIES)
+        if len(texts) < min_examples:
+            raise click.ClickException(f"Only {len(texts)} labelled case(s), need at least {min_examples}")
+
+        model = LocalClassifier.train(texts, labels)
+        model.save(MODEL_PATH)
+        click.echo(f"Trained on {len(texts)} case(s), {len(model.vocabulary)} terms, saved to {MODEL_PATH}")
+
+    @app.cli.command("reindex-documents")
+    def reindex_documents_command():
+        """Re-extract the searchable text of every case's documents."""
+        from utils.text_extraction import index_case_documents
+
+        db = get_db()
+        count = 0
+        for case in db.cases.find({"documents.0": {"$exists": True}}, {"documents": 1}):
+            index_case_documents(db, case["_id"], case["documents"])
+            count += 1
+        click.echo(f"Indexed documents of {count} case(s)")
+
+    @app.cli.command("migrate-comments")
+    def migrate_comments_command():
+        """Move comments embedded in case documents into case_comments buckets."""
+        from database.comments import migrate_embedded_comments
+
+        db = get_db()
+        count = 0
+        for case in db.cases.find({"comments.0": {"$exists": True}}, {"comments": 1, "created_at": 1}):
+            migrate_embedded_comments(db, case)
+            count += 1
+        click.echo(f"Migrated comments of {count} case(s)")
+
+    @app.cli.command("reconcile-counters")
+    def reconcile_counters_command():
+        """Rebuild every user's dashboard counters and lawyer workloads from the cases collection."""
+        db = get_db()
+        filled = ensure_profile_defaults(db)
+        if filled:
+            click.echo(f"Filled in {filled} missing lawyer profile field(s)")
+        users = rebuild_counters(db)
+        click.echo(f"Rebuilt dashboard counters for {users} user(s)")
+
+    @app.cli.command("backfill-urgency-rank")
+    def backfill_urgency_rank_command():
+        """Set urgencyRank on cases created before it was stored."""
+        from database.case_schema import URGENCY_RANKS
+
+        db = get_db()
+        missing = {"urgencyRank": {"$exists": False}}
+        updated = 0
+        for level, rank in URGENCY_RANKS.items():
+            updated += db.cases.update_many(dict(missing, urgencyLevel=level), {"$set": {"urgencyRank": rank}}).modified_count
+        updated += db.cases.update_many(missing, {"$set": {"urgencyRank": 0}}).modified_count
+        click.echo(f"Set urgencyRank on {updated} case(s)")
@@ -7,35 +7,57 @@ case_schema = {
     "description": "String",         # Detailed description of the case
     "category": "String",            # Category of the case (civil, criminal, etc.)
     "urgencyLevel": "String",        # Urgency level (Low, Medium, High)
+    "urgencyRank": "Int",            # Numeric urgency for dispatch order, see URGENCY_RANKS
     "communicationMethod": "String", # Preferred communication method
     "specialRequirements": "String", # Any special requirements or notes
+    "aiClassified": "Boolean",       # Whether the category was chosen by Gemini
+    "classificationStatus": "String", # Background classification (pending, done, failed)
+    "classificationSource": "String", # Who chose the category (user, local, gemini)
     "clientId": "ObjectId",          # Reference to the client user
     "clientName": "String",          # Full name of the client
     "assignedLawyer": "ObjectId",    # Reference to the assigned lawyer (if any)
     "status": "String",              # Case status (Pending, Assigned, InProgress, Closed)
     "created_at": "DateTime",        # When the case was created
     "updated_at": "DateTime",        # When the case was last updated
+    "statusHistory": [               # Last status changes, see utils/case_state.py
+        {"from": "String", "to": "String", "userId": "ObjectId", "timestamp": "DateTime"}
+    ],
     "documents": [                   # Array of uploaded documents
         {
             "filename": "String",    # Original filename
-            "path": "String",        # Path to the saved file
+            "sha256": "String",      # Content hash, key into document_blobs
+            "size": "Int",           # Size in bytes
+            "contentType": "String", # MIME type reported by the client
+            "path": "String",        # Path to the stored object (uploads/objects/...)
             "uploadedAt": "DateTime" # When the file was uploaded
         }
     ],
-    "comments": [                    # Array of comments/updates
-        {
-            "userId": "ObjectId",    # User who made the comment
-            "userType": "String",    # Type of user (client or lawyer)
-            "text": "String",        # Comment text
-            "timestamp": "DateTime"  # When the comment was made
-        }
-    ]
+    "documentsText": "String",       # Text extracted from the documents, for search
+    "commentCount": "Int",           # Number of comments on the case
+    # Comments/updates live in the case_comments collection, in buckets of
+    # up to database.comments.BUCKET_SIZE:
+    # {caseId, count, first_at, last_at,
+    #  comments: [{userId, userType, text, timestamp}]}
 }
 
+# Dispatch order of the urgency levels; unknown levels sort last
+URGENCY_RANKS = {"Low": 1, "Medium": 2, "High": 3}
+
+def urgency_rank(level):
+    return URGENCY_RANKS.get(level, 0)
+
+# Order in which pending cases are offered to lawyers: most urgent first,
+# then the longest waiting
+DISPATCH_SORT = [("urgencyRank", -1), ("created_at", 1), ("_id", 1)]
+
 # Example MongoDB indexes to create
 indexes = [
-    # Index for faster lookup by client
-    {"clientId": 1, "created_at": -1},
+    # Index for faster lookup by client (client case list, newest first)
+    {"clientId": 1, "created_at": -1, "_id": -1},
+    # Index for the lawyer's assigned case list, most recently updated first
+    {"assignedLawyer": 1, "updated_at": -1, "_id": -1},
+    # Index for the client case list's ETag (latest update of a client's cases)
+    {"clientId": 1, "updated_at": -1},
     # Index for faster lookup by lawyer
     {"assignedLawyer": 1, "status": 1, "created_at": -1},
     # Index for finding cases by status
@@ -44,6 +66,28 @@ indexes = [
     {"category": 1, "status": 1, "created_at": -1}
 ]
 
+# Projection used by case list endpoints. Comments and documents are only
+# returned by the case details endpoint, and the description is truncated
+# to a preview.
+DESCRIPTION_PREVIEW_LENGTH = 300
+
+summary_projection = {
+    "title": 1,
+    "description": {"$substrCP": ["$description", 0, DESCRIPTION_PREVIEW_LENGTH]},
+    "category": 1,
+    "urgencyLevel": 1,
+    "urgencyRank": 1,
+    "communicationMethod": 1,
+    "clientId": 1,
+    "clientName": 1,
+    "assignedLawyer": 1,
+    "status": 1,
+    "created_at": 1,
+    "updated_at": 1,
+    "aiClassified": 1,
+    "classificationStatus": 1
+}
+
 # Example MongoDB validation schema
 validation_schema = {
     "$jsonSchema": {
@@ -75,6 +119,5 @@ validation_schema = {
 # To set up the validation schema in MongoDB, use:
 # db.createCollection("cases", { validator: validation_schema })
 
-# To add indexes to the collection:
-# for index in indexes:
-#     db.cases.createIndex(index)
+# Indexes are created by database/indexes.py, either with
+# `flask ensure-indexes` or at startup when ENSURE_INDEXES_ON_STARTUP is set.
@@ -0,0 +1,107 @@
+# database/comments.py
+from datetime import datetime
+from pymongo import ReturnDocument
+from database.db import serialize_doc
+from utils.pagination import paginate, encode_cursor
+
+# Comments are stored outside the case document, BUCKET_SIZE per document
+# in the case_comments collection:
+# {caseId, count, first_at, last_at, comments: [{userId, userType, text, timestamp}]}
+BUCKET_SIZE = 50
+
+
+def add_case_comment(db, case_id, comment):
+    """
+    Append a comment to the newest bucket of a case, opening a new bucket
+    when the current one is full. The caller bumps the case's commentCount,
+    normally in the same update that changes the case.
+
+    Returns:
+        dict: The bucket after the write (_id, count, first_at, comments)
+    """
+    return db.case_comments.find_one_and_update(
+        {"caseId": case_id, "count": {"$lt": BUCKET_SIZE}},
+        {
+            "$push": {"comments": comment},
+            "$inc": {"count": 1},
+            "$set": {"last_at": comment["timestamp"]},
+            "$setOnInsert": {"first_at": comment["timestamp"]}
+        },
+        # A case can have several open buckets (a partial one left by
+        # migrate-comments, or two concurrent upserts); always append to
+        # the newest so comments stay on the newest page
+        sort=[("first_at", -1), ("_id", -1)],
+        projection={"count": 1, "first_at": 1, "comments": 1},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def get_case_comments(db, case_id, cursor=None):
+    """
+    Return one page of a case's comments: a whole bucket, newest bucket first,
+    comments within it in chronological order.
+
+    Raises:
+        ValueError: If `cursor` is malformed
+
+    Returns:
+        tuple: (list of comments, next token or None)
+    """
+    buckets, next_token = paginate(
+        db.case_comments,
+        {"caseId": case_id},
+        [("first_at", -1), ("_id", -1)],
+        1,
+        cursor=cursor,
+        projection={"comments": 1, "first_at": 1}
+    )
+    comments = buckets[0]["comments"] if buckets else []
+    return comments, next_token
+
+
+def attach_recent_comments(db, case_dict, case_id):
+    """Add the newest page of comments to a serialized case, as the case used to embed them."""
+    comments, next_token = get_case_comments(db, case_id)
+    case_dict["comments"] = serialize_doc(comments)
+    case_dict["commentsNext"] = next_token
+    return case_dict
+
+
+def attach_bucket_comments(case_dict, bucket):
+    """
+    Like attach_recent_comments, but from the bucket returned by
+    add_case_comment, so no extra read is needed.
+    """
+    case_dict["comments"] = serialize_doc(bucket["comments"])
+    has_older = case_dict.get("commentCount", 0) > bucket["count"]
+    case_dict["commentsNext"] = encode_cursor([bucket["first_at"], bucket["_id"]]) if has_older else None
+    return case_dict
+
+
+def migrate_embedded_comments(db, case):
+    """
+    Move a case's embedded comments array into buckets. Re-running after a
+    partial failure first removes the buckets written by the earlier attempt.
+    """
+    comments = sorted(case.get("comments") or [], key=lambda c: c.get("timestamp") or datetime.min)
+    db.case_comments.delete_many({"caseId": case["_id"], "migrated": True})
+
+    buckets = []
+    for i in range(0, len(comments), BUCKET_SIZE):
+        chunk = comments[i:i + BUCKET_SIZE]
+        buckets.append({
+            "caseId": case["_id"],
+            "count": len(chunk),
+            "first_at": chunk[0].get("timestamp") or case.get("created_at"),
+            "last_at": chunk[-1].get("timestamp") or case.get("created_at"),
+            "comments": chunk,
+            "migrated": True
+        })
+    if buckets:
+        db.case_comments.insert_many(buckets)
+
+    db.cases.update_one(
+        {"_id": case["_id"]},
+        {"$unset": {"comments": ""}, "$inc": {"commentCount": len(comments)}}
+    )
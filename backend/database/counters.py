@@ -0,0 +1,221 @@
+# database/counters.py
+import logging
+from datetime import datetime
+from pymongo import UpdateOne, ReplaceOne
+
+logger = logging.getLogger(__name__)
+
+# Dashboard counters, one document per user in the user_counters collection,
+# kept in step with the cases by $inc wherever cases are created or change:
+# {_id: userId, total, open, byStatus: {status: n}, byCategory: {category: n},
+#  recent: [{caseId, title, event, status, timestamp}], updated_at}
+RECENT_ACTIVITY_LIMIT = 10
+
+# Category key for cases still waiting on classification
+UNCLASSIFIED = "unclassified"
+
+# Cases in these statuses no longer count towards open work
+CLOSED_STATUSES = {"Closed"}
+
+
+def _category_key(category):
+    return category or UNCLASSIFIED
+
+
+def _is_open(status):
+    return status not in CLOSED_STATUSES
+
+
+def _activity(case, event, now):
+    return {
+        "caseId": case["_id"],
+        "title": case.get("title", ""),
+        "event": event,
+        "status": case.get("status"),
+        "timestamp": now
+    }
+
+
+def _counter_update(user_id, inc, activity=None, now=None):
+    """One upserting $inc (and optional activity entry) for a user's counters."""
+    update = {"$set": {"updated_at": now or datetime.utcnow()}}
+    inc = {field: value for field, value in inc.items() if value}
+    if inc:
+        update["$inc"] = inc
+    if activity:
+        update["$push"] = {"recent": {"$each": [activity], "$slice": -RECENT_ACTIVITY_LIMIT}}
+    return UpdateOne({"_id": user_id}, update, upsert=True)
+
+
+def apply_counter_updates(db, operations):
+    """
+    Write counter updates in one round trip. Failures are logged rather than
+    raised: the case change has already happened, and `flask
+    reconcile-counters` repairs any drift.
+    """
+    if not operations:
+        return
+    try:
+        db.user_counters.bulk_write(operations, ordered=False)
+    except Exception:
+        logger.exception("Error updating dashboard counters")
+
+
+def adjust_open_case_count(db, lawyer_id, delta):
+    """Keep the lawyer directory's openCaseCount in step with the counters."""
+    if not lawyer_id or not delta:
+        return
+    try:
+        db.users.update_one({"_id": lawyer_id}, {"$inc": {"openCaseCount": delta}})
+    except Exception:
+        logger.exception("Error updating open case count")
+
+
+def record_case_created(db, case):
+    """Count a newly reported case for its client."""
+    now = case.get("created_at")
+    apply_counter_updates(db, [_counter_update(
+        case["clientId"],
+        {
+            "total": 1,
+            "open": 1,
+            f"byStatus.{case['status']}": 1,
+            f"byCategory.{_category_key(case.get('category'))}": 1
+        },
+        _activity(case, "created", now),
+        now
+    )])
+
+
+def record_case_assigned(db, case, from_status="Pending"):
+    """Move an accepted case from pending for its client and add it to the lawyer's workload."""
+    now = case.get("updated_at")
+    apply_counter_updates(db, [
+        _counter_update(
+            case["clientId"],
+            {f"byStatus.{from_status}": -1, f"byStatus.{case['status']}": 1},
+            _activity(case, "assigned", now),
+            now
+        ),
+        _counter_update(
+            case["assignedLawyer"],
+            {
+                "total": 1,
+                "open": 1,
+                f"byStatus.{case['status']}": 1,
+                f"byCategory.{_category_key(case.get('category'))}": 1
+            },
+            _activity(case, "accepted", now),
+            now
+        )
+    ])
+    adjust_open_case_count(db, case["assignedLawyer"], int(_is_open(case["status"])))
+
+
+def record_status_change(db, case, from_status):
+    """Move a case between statuses for both its client and its lawyer."""
+    to_status = case["status"]
+    if to_status == from_status:
+        return
+    now = case.get("updated_at")
+    inc = {
+        f"byStatus.{from_status}": -1,
+        f"byStatus.{to_status}": 1,
+        "open": int(_is_open(to_status)) - int(_is_open(from_status))
+    }
+    apply_counter_updates(db, [
+        _counter_update(user_id, inc, _activity(case, "status", now), now)
+        for user_id in (case.get("clientId"), case.get("assignedLawyer")) if user_id
+    ])
+    adjust_open_case_count(db, case.get("assignedLawyer"), inc["open"])
+
+
+def category_change_updates(case, from_category, to_category):
+    """Counter updates for a case moving between categories, for batching."""
+    from_key, to_key = _category_key(from_category), _category_key(to_category)
+    if from_key == to_key:
+        return []
+    inc = {f"byCategory.{from_key}": -1, f"byCategory.{to_key}": 1}
+    return [
+        _counter_update(user_id, inc)
+        for user_id in (case.get("clientId"), case.get("assignedLawyer")) if user_id
+    ]
+
+
+def record_category_change(db, case, from_category, to_category):
+    """Move a case between categories, e.g. once it has been classified."""
+    apply_counter_updates(db, category_change_updates(case, from_category, to_category))
+
+
+def get_counters(db, user_id):
+    """The user's counters document, or empty counters for a user without cases."""
+    counters = db.user_counters.find_one({"_id": user_id})
+    if not counters:
+        counters = {"_id": user_id, "total": 0, "open": 0, "byStatus": {}, "byCategory": {}, "recent": []}
+    return counters
+
+
+def dashboard_summary(counters):
+    """Shape a counters document for the dashboard endpoints, newest activity first."""
+    return {
+        "totalCases": counters.get("total", 0),
+        "openCases": counters.get("open", 0),
+        "byStatus": {status: n for status, n in counters.get("byStatus", {}).items() if n},
+        "byCategory": {category: n for category, n in counters.get("byCategory", {}).items() if n},
+        "recentActivity": list(reversed(counters.get("recent", [])))
+    }
+
+
+def rebuild_counters(db, batch_size=500):
+    """
+    Recompute every user's counters from the cases collection and replace
+    the stored documents, along with each lawyer's openCaseCount. Recent
+    activity is rebuilt from the most recently updated cases.
+
+    Returns:
+        int: Number of users with counters
+    """
+    now = datetime.utcnow()
+    counters = {}
+    lawyer_open = {}
+
+    def counters_for(user_id):
+        if user_id not in counters:
+            counters[user_id] = {
+                "_id": user_id, "total": 0, "open": 0, "byStatus": {}, "byCategory": {},
+                "recent": [], "updated_at": now
+            }
+        return counters[user_id]
+
+    projection = {"clientId": 1, "assignedLawyer": 1, "status": 1, "category": 1, "title": 1, "updated_at": 1}
+    for case in db.cases.find({}, projection).sort("updated_at", -1):
+        for user_id in (case.get("clientId"), case.get("assignedLawyer")):
+            if not user_id:
+                continue
+            entry = counters_for(user_id)
+            entry["total"] += 1
+            entry["open"] += int(_is_open(case.get("status")))
+            entry["byStatus"][case.get("status")] = entry["byStatus"].get(case.get("status"), 0) + 1
+            category = _category_key(case.get("category"))
+            entry["byCategory"][category] = entry["byCategory"].get(category, 0) + 1
+            if len(entry["recent"]) < RECENT_ACTIVITY_LIMIT:
+                # Stored oldest first, like the $push/$slice updates
+                entry["recent"].insert(0, _activity(case, "updated", case.get("updated_at")))
+        if case.get("assignedLawyer"):
+            lawyer_open[case["assignedLawyer"]] = (
+                lawyer_open.get(case["assignedLawyer"], 0) + int(_is_open(case.get("status")))
+            )
+
+    operations = [ReplaceOne({"_id": user_id}, entry, upsert=True) for user_id, entry in counters.items()]
+    for i in range(0, len(operations), batch_size):
+        db.user_counters.bulk_write(operations[i:i + batch_size], ordered=False)
+    db.user_counters.delete_many({"_id": {"$nin": list(counters)}})
+
+    workloads = [UpdateOne({"_id": user_id}, {"$set": {"openCaseCount": n}}) for user_id, n in lawyer_open.items()]
+    for i in range(0, len(workloads), batch_size):
+        db.users.bulk_write(workloads[i:i + batch_size], ordered=False)
+    db.users.update_many(
+        {"userType": "lawyer", "_id": {"$nin": list(lawyer_open)}},
+        {"$set": {"openCaseCount": 0}}
+    )
+    return len(counters)
@@ -1,6 +1,7 @@
 # database/db.py
-from pymongo import MongoClient
+from pymongo import MongoClient, ReadPreference
 import os
+import threading
 from dotenv import load_dotenv
 from bson.objectid import ObjectId
 from datetime import datetime
@@ -8,16 +9,95 @@ from datetime import datetime
 # Load environment variables
 load_dotenv()
 
-# MongoDB connection
+# MongoDB connection, created on first use so importing this module
+# does no network I/O (mongodb+srv URIs need a DNS lookup)
 mongo_uri = os.getenv("MONGO_URI", "mongodb://localhost:27017/legal_app")
-client = MongoClient(mongo_uri)
-db = client.get_database()
+
+# Connection pool, per process. Each gunicorn worker opens its own pool, so
+# the server sees up to workers x MONGO_MAX_POOL_SIZE connections; size it
+# to the requests one worker runs at once (its threads, or
+# ASYNC_MAX_CONNECTIONS under serve_async.py, which then queue for a
+# connection for at most MONGO_WAIT_QUEUE_TIMEOUT_MS).
+MONGO_CLIENT_OPTIONS = {
+    "maxPoolSize": int(os.getenv("MONGO_MAX_POOL_SIZE", "100")),
+    "minPoolSize": int(os.getenv("MONGO_MIN_POOL_SIZE", "0")),
+    "maxIdleTimeMS": int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000")),
+    "connectTimeoutMS": int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000")),
+    "serverSelectionTimeoutMS": int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000")),
+    "socketTimeoutMS": int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000")),
+    "waitQueueTimeoutMS": int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "5000"))
+}
+
+# Read preference for heavy list and search reads (get_read_db). Secondary
+# reads may lag the primary, so a case a client just reported can be
+# missing from their list for a moment; keep "primary" without replicas.
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST
+}
+LIST_READ_PREFERENCE = os.getenv("MONGO_LIST_READ_PREFERENCE", "primary")
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """
+    The process's MongoClient, created on first use.
+
+    A client must not be used across fork(): a worker forked from a
+    preloaded master creates its own instead of inheriting the parent's.
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                _client = MongoClient(mongo_uri, **MONGO_CLIENT_OPTIONS)
+                _client_pid = os.getpid()
+    return _client
+
+def reset_client():
+    """Forget the client inherited from a parent process (after fork)."""
+    global _client, _client_pid, _client_lock
+    # The lock may have been held by another thread at fork time
+    _client_lock = threading.Lock()
+    _client = None
+    _client_pid = None
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_client)
 
 def get_db():
-    return db
+    return get_client().get_database()
 
-# Enhanced helper function to serialize MongoDB documents
+def get_read_db():
+    """
+    The database with MONGO_LIST_READ_PREFERENCE applied, for list and
+    search reads that may be served by a secondary. Writes, and reads that
+    guard a write, use get_db().
+    """
+    if LIST_READ_PREFERENCE not in READ_PREFERENCES:
+        raise ValueError(f"Unknown MONGO_LIST_READ_PREFERENCE: {LIST_READ_PREFERENCE}")
+    return get_db().with_options(read_preference=READ_PREFERENCES[LIST_READ_PREFERENCE])
+
+# Compatibility shim: responses are encoded by utils.json_provider, which
+# handles ObjectId and datetime itself
 def serialize_doc(doc):
+    """
+    Return a shallow copy of a MongoDB document (or list of documents) that
+    callers may modify before returning it with jsonify. Values are left
+    as they are; use to_jsonable where the standard json module is used.
+    """
+    if isinstance(doc, dict):
+        return dict(doc)
+    if isinstance(doc, list):
+        return list(doc)
+    return doc
+
+def to_jsonable(doc):
     """
     Convert MongoDB document to a JSON serializable format.
     This handles ObjectId, datetime, and nested documents/arrays.
@@ -35,10 +115,10 @@ def serialize_doc(doc):
         return doc.isoformat()
         
     if isinstance(doc, list):
-        return [serialize_doc(item) for item in doc]
+        return [to_jsonable(item) for item in doc]
         
     if isinstance(doc, dict):
-        return {key: serialize_doc(value) for key, value in doc.items()}
+        return {key: to_jsonable(value) for key, value in doc.items()}
         
     # Default for any other types
     return str(doc)
\ No newline at end of file
@@ -0,0 +1,149 @@
+# database/indexes.py
+import logging
+from datetime import datetime
+from bson.objectid import ObjectId
+from pymongo.errors import OperationFailure
+from database.case_schema import indexes as case_indexes, DISPATCH_SORT
+from utils.classification_cache import CACHE_TTL_DAYS
+
+logger = logging.getLogger(__name__)
+
+# Index specifications per collection, as (keys, options) pairs
+INDEX_SPECS = {
+    "cases": [(list(keys.items()), {}) for keys in case_indexes] + [
+        # Lawyers' available-case pool in DISPATCH_SORT order, and claim-next
+        # with or without a category: only pending cases are ever unassigned
+        (
+            [("status", 1), ("urgencyRank", -1), ("created_at", 1), ("_id", 1)],
+            {"name": "pending_dispatch", "partialFilterExpression": {"status": "Pending"}}
+        ),
+        (
+            [("status", 1), ("category", 1), ("urgencyRank", -1), ("created_at", 1), ("_id", 1)],
+            {"name": "pending_dispatch_by_category", "partialFilterExpression": {"status": "Pending"}}
+        ),
+        # ETag of the available-case pool (latest update among pending cases)
+        (
+            [("status", 1), ("updated_at", -1)],
+            {"name": "pending_by_update", "partialFilterExpression": {"status": "Pending"}}
+        ),
+        # Full-text search over cases and their uploaded documents; comments
+        # are searched through case_comments
+        (
+            [("title", "text"), ("description", "text"), ("documentsText", "text")],
+            {
+                "name": "case_search",
+                "weights": {"title": 10, "description": 5, "documentsText": 1},
+                "default_language": "english"
+            }
+        )
+    ],
+    "case_comments": [
+        # Newest bucket of a case first, and the open bucket on insert
+        ([("caseId", 1), ("first_at", -1), ("_id", -1)], {}),
+        # Comment search, merged into the case search results
+        ([("comments.text", "text")], {"name": "comment_search", "default_language": "english"})
+    ],
+    "users": [
+        # Login and signup look users up by email
+        ([("email", 1)], {"unique": True}),
+        # Lawyer directory, in DIRECTORY_SORT order, with and without a specialization
+        (
+            [("rating", -1), ("openCaseCount", 1), ("_id", 1)],
+            {"name": "lawyer_directory", "partialFilterExpression": {"userType": "lawyer"}}
+        ),
+        (
+            [("specializations", 1), ("rating", -1), ("openCaseCount", 1), ("_id", 1)],
+            {"name": "lawyer_directory_by_specialization", "partialFilterExpression": {"userType": "lawyer"}}
+        )
+    ],
+    "revoked_tokens": [
+        # Checked on every authenticated request
+        ([("jti", 1)], {"unique": True}),
+        # Polled by the in-process revoked token cache
+        ([("created_at", 1)], {}),
+        # Drop revocations once the token has expired
+        ([("expires_at", 1)], {"expireAfterSeconds": 0})
+    ],
+    "classification_cache": [
+        # Cached Gemini answers expire after CLASSIFICATION_CACHE_TTL_DAYS
+        ([("created_at", 1)], {"expireAfterSeconds": CACHE_TTL_DAYS * 24 * 3600})
+    ],
+    "classification_jobs": [
+        # Claiming the next due job, and reclaiming jobs with expired leases
+        ([("status", 1), ("availableAt", 1)], {}),
+        ([("status", 1), ("leaseExpiresAt", 1)], {})
+    ]
+}
+
+# Representative queries issued by the routes, checked with explain()
+_SAMPLE_ID = ObjectId("000000000000000000000000")
+ROUTE_QUERIES = [
+    ("auth.login", "users", {"email": "user@example.com"}, None),
+    ("auth.revoked_token_poll", "revoked_tokens", {"created_at": {"$gt": datetime(2025, 1, 1)}}, None),
+    ("case.client_cases", "cases", {"clientId": _SAMPLE_ID},
+     [("created_at", -1), ("_id", -1)]),
+    ("lawyer_case.available_cases", "cases", {"status": "Pending", "assignedLawyer": None}, DISPATCH_SORT),
+    ("lawyer_case.claim_next", "cases", {"status": "Pending", "assignedLawyer": None, "category": "family"},
+     DISPATCH_SORT),
+    ("lawyer_case.available_cases_etag", "cases", {"status": "Pending", "assignedLawyer": None},
+     [("updated_at", -1)]),
+    ("case.client_cases_etag", "cases", {"clientId": _SAMPLE_ID}, [("updated_at", -1)]),
+    ("lawyer_case.assigned_cases", "cases", {"assignedLawyer": _SAMPLE_ID},
+     [("updated_at", -1), ("_id", -1)]),
+    ("client.find_lawyers", "users", {"userType": "lawyer"},
+     [("rating", -1), ("openCaseCount", 1), ("_id", 1)]),
+    ("client.find_lawyers_by_specialization", "users", {"userType": "lawyer", "specializations": "family"},
+     [("rating", -1), ("openCaseCount", 1), ("_id", 1)]),
+    ("case.comments", "case_comments", {"caseId": _SAMPLE_ID},
+     [("first_at", -1), ("_id", -1)])
+]
+
+
+def ensure_indexes(db):
+    """
+    Create every index in INDEX_SPECS. Safe to run repeatedly.
+
+    Returns:
+        list: (collection, index name) pairs that could not be created
+    """
+    failures = []
+    for collection_name, specs in INDEX_SPECS.items():
+        collection = db[collection_name]
+        for keys, options in specs:
+            try:
+                collection.create_index(keys, **options)
+            except OperationFailure:
+                name = options.get("name") or "_".join(f"{k}_{d}" for k, d in keys)
+                logger.exception("Could not create index %s.%s", collection_name, name)
+                failures.append((collection_name, name))
+    return failures
+
+
+def _plan_stages(plan):
+    """Yield every stage name in an explain() plan tree."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from _plan_stages(value)
+    elif isinstance(plan, list):
+        for item in plan:
+            yield from _plan_stages(item)
+
+
+def find_collection_scans(db):
+    """
+    Explain each query in ROUTE_QUERIES.
+
+    Returns:
+        list: Names of the route queries whose winning plan is a COLLSCAN
+    """
+    offenders = []
+    for name, collection_name, query, sort in ROUTE_QUERIES:
+        cursor = db[collection_name].find(query).limit(1)
+        if sort:
+            cursor = cursor.sort(sort)
+        winning_plan = cursor.explain().get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in _plan_stages(winning_plan):
+            offenders.append(name)
+    return offenders
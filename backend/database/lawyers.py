@@ -0,0 +1,85 @@
+# database/lawyers.py
+from database.users import full_name
+from utils.pagination import paginate
+
+# Lawyer profile fields kept on the user document. Every lawyer has all of
+# them, so directory sorting and keyset cursors never meet a missing value.
+PROFILE_DEFAULTS = {
+    "barNumber": "",
+    "specializations": [],   # Case categories, see utils.gemini_classifier.CASE_CATEGORIES
+    "bio": "",
+    "experience": 0,         # Years of practice
+    "rating": 0.0,
+    "openCaseCount": 0       # Assigned cases not yet closed, kept by database.counters
+}
+
+# Fields a lawyer may change through PUT /api/lawyer/profile
+EDITABLE_FIELDS = {"firstName", "lastName", "barNumber", "specializations", "bio", "experience"}
+
+# Fields returned by the profile endpoints and the directory
+PROFILE_PROJECTION = dict(
+    {field: 1 for field in PROFILE_DEFAULTS},
+    firstName=1, lastName=1, email=1, roles=1
+)
+
+# Directory ranking: best rated first, then the lightest current workload
+DIRECTORY_SORT = [("rating", -1), ("openCaseCount", 1), ("_id", 1)]
+
+
+def lawyer_profile(user):
+    """Shape a lawyer's user document for the API."""
+    return {
+        "id": str(user["_id"]),
+        "name": full_name(user),
+        "email": user.get("email", ""),
+        "barNumber": user.get("barNumber", ""),
+        "specializations": user.get("specializations", []),
+        "bio": user.get("bio", ""),
+        "experience": user.get("experience", 0),
+        "rating": user.get("rating", 0),
+        "openCaseCount": user.get("openCaseCount", 0)
+    }
+
+
+def search_lawyers(db, limit, cursor=None, specialization=None, min_rating=None,
+                   max_open_cases=None, min_experience=None):
+    """
+    One page of the lawyer directory, ranked by DIRECTORY_SORT.
+
+    Served by the partial lawyer_directory indexes (userType "lawyer"),
+    with or without a specialization, so a page is an index range scan.
+
+    Raises:
+        ValueError: If `cursor` is malformed
+
+    Returns:
+        tuple: (list of user documents, next token or None)
+    """
+    query = {"userType": "lawyer"}
+    if specialization:
+        query["specializations"] = specialization
+    if min_rating is not None:
+        query["rating"] = {"$gte": min_rating}
+    if max_open_cases is not None:
+        query["openCaseCount"] = {"$lte": max_open_cases}
+    if min_experience is not None:
+        query["experience"] = {"$gte": min_experience}
+
+    return paginate(db.users, query, DIRECTORY_SORT, limit, cursor=cursor, projection=PROFILE_PROJECTION)
+
+
+def ensure_profile_defaults(db):
+    """
+    Give lawyers created before profiles were stored the default values.
+
+    Returns:
+        int: Number of fields filled in
+    """
+    filled = 0
+    for field, default in PROFILE_DEFAULTS.items():
+        result = db.users.update_many(
+            {"userType": "lawyer", field: {"$exists": False}},
+            {"$set": {field: default}}
+        )
+        filled += result.modified_count
+    return filled
@@ -0,0 +1,33 @@
+# database/users.py
+from bson.objectid import ObjectId
+
+# Fields needed to display a user alongside a case
+USER_SUMMARY_PROJECTION = {"firstName": 1, "lastName": 1, "email": 1}
+
+
+def full_name(user):
+    """Return the display name of a user document."""
+    return f"{user.get('firstName', '')} {user.get('lastName', '')}"
+
+
+def load_users(db, user_ids, projection=None):
+    """
+    Fetch many users in a single round trip.
+
+    Args:
+        db: The MongoDB database handle
+        user_ids (iterable): User ids (ObjectId or str); None values are skipped
+        projection (dict): Fields to return, defaults to USER_SUMMARY_PROJECTION
+
+    Returns:
+        dict: Mapping of ObjectId to user document
+    """
+    ids = {ObjectId(user_id) for user_id in user_ids if user_id}
+    if not ids:
+        return {}
+
+    users = db.users.find(
+        {"_id": {"$in": list(ids)}},
+        projection or USER_SUMMARY_PROJECTION
+    )
+    return {user["_id"]: user for user in users}
@@ -0,0 +1,94 @@
+# gunicorn.conf.py
+"""
+Gunicorn settings, tuned through the environment:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Every worker has its own MongoDB pool (database/db.py), created lazily
+after fork. A worker runs up to GUNICORN_THREADS requests at once (gthread)
+or ASYNC_MAX_CONNECTIONS (gevent), so MONGO_MAX_POOL_SIZE should be at
+least that many, and the server sees up to
+WEB_CONCURRENCY x MONGO_MAX_POOL_SIZE connections.
+
+With several workers, export PROMETHEUS_MULTIPROC_DIR (an empty, writable
+directory) so GET /metrics aggregates all of them. It is read when
+prometheus_client is imported, so it cannot come from .env.
+"""
+import glob
+import logging
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count() * 2 + 1)))
+
+# Events must reach streams on every worker, so several workers share the
+# MongoDB event bus (utils/events.py) unless EVENT_BUS says otherwise
+os.environ.setdefault("WEB_CONCURRENCY", str(workers))
+os.environ.setdefault("EVENT_BUS", "mongo" if workers > 1 else "memory")
+
+# "gthread" or "gevent". Under gthread each open event stream holds one of
+# the worker's GUNICORN_THREADS threads for up to EVENT_STREAM_MAX_SECONDS
+# (300 s by default), so a few idle dashboards can starve the API; use
+# gevent, where a stream only holds a greenlet, for many concurrent streams.
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+worker_connections = int(os.getenv("ASYNC_MAX_CONNECTIONS", "1000"))
+
+if worker_class == "gevent":
+    # gRPC does not cooperate with gevent's patched sockets
+    os.environ.setdefault("GEMINI_TRANSPORT", "rest")
+
+# Import the app once in the master so workers share its memory. The gevent
+# worker must patch the standard library before the app is imported, so it
+# loads the app in each worker instead.
+preload_app = os.getenv("GUNICORN_PRELOAD", "false" if worker_class == "gevent" else "true").lower() == "true"
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+logger = logging.getLogger("gunicorn.error")
+
+
+def on_starting(server):
+    # Metric files left by a previous run would be added to this one's
+    metrics_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if metrics_dir:
+        os.makedirs(metrics_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(metrics_dir, "*.db")):
+            os.remove(path)
+
+
+def when_ready(server):
+    # Read from the environment: importing pymongo here, before the gevent
+    # worker patches ssl and socket, would leave it unpatched
+    pool_size = int(os.getenv("MONGO_MAX_POOL_SIZE", "100"))
+    concurrency = worker_connections if worker_class == "gevent" else threads
+    if pool_size < concurrency:
+        logger.warning(
+            "MONGO_MAX_POOL_SIZE (%s) is below the %s requests a worker runs at once; "
+            "requests will queue for connections", pool_size, concurrency
+        )
+    logger.info("Up to %s MongoDB connections across %s workers", pool_size * workers, workers)
+    if workers > 1 and os.environ["EVENT_BUS"].lower() != "mongo":
+        logger.warning(
+            "EVENT_BUS=%s with %s workers: event streams only see events published by their own worker",
+            os.environ["EVENT_BUS"], workers
+        )
+
+
+def post_fork(server, worker):
+    # A client created in the master (preload_app) must not be used by the
+    # workers. database/db.py also resets it through os.register_at_fork;
+    # this keeps the reset explicit for servers that fork differently.
+    if preload_app:
+        from database.db import reset_client
+        reset_client()
+
+
+def child_exit(server, worker):
+    # Stop reporting the gauges of a worker that is gone
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
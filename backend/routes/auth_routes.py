@@ -1,6 +1,6 @@
 # routes/auth_routes.py
+import logging
 from flask import Blueprint, request, jsonify
-from flask_bcrypt import Bcrypt
 from flask_jwt_extended import (
     create_access_token, create_refresh_token, 
     jwt_required, get_jwt_identity, get_jwt
@@ -11,10 +11,36 @@ import jwt
 from flask import current_app
 
 from database.db import get_db, serialize_doc
+from database.lawyers import PROFILE_DEFAULTS
+from utils.token_blocklist import revoked_token_cache
+from utils.passwords import password_hasher, needs_rehash, PasswordHasherBusy
+
+logger = logging.getLogger(__name__)
 
 # Create blueprint
 auth_bp = Blueprint('auth', __name__)
-bcrypt = Bcrypt()
+
+# Seconds a client is asked to wait when the password hasher is saturated
+BUSY_RETRY_AFTER_SECONDS = 1
+
+def _hasher_busy():
+    response = jsonify({"message": "Too many sign-in attempts in progress, please retry shortly"})
+    response.headers["Retry-After"] = str(BUSY_RETRY_AFTER_SECONDS)
+    return response, 503
+
+def _upgrade_password_hash(db, user, password):
+    """Rehash a password stored with an outdated cost. Failures only mean it is tried again next login."""
+    try:
+        new_hash = password_hasher.hash_password(password)
+        # Guarded by the old hash, so a concurrent password change wins
+        db.users.update_one(
+            {"_id": user["_id"], "password": user["password"]},
+            {"$set": {"password": new_hash}}
+        )
+    except PasswordHasherBusy:
+        pass
+    except Exception:
+        logger.exception("Error rehashing password")
 
 @auth_bp.route("/signup", methods=["POST"])
 def signup():
@@ -26,7 +52,10 @@ def signup():
         return jsonify({"message": "Email already registered"}), 409
     
     # Hash the password
-    hashed_password = bcrypt.generate_password_hash(data["password"]).decode("utf-8")
+    try:
+        hashed_password = password_hasher.hash_password(data["password"])
+    except PasswordHasherBusy:
+        return _hasher_busy()
     
     # Prepare user document
     new_user = {
@@ -39,6 +68,10 @@ def signup():
         "created_at": datetime.utcnow()
     }
     
+    # Lawyers start with an empty directory profile
+    if data["userType"] == "lawyer":
+        new_user.update(PROFILE_DEFAULTS, specializations=[])
+    
     # Add bar number for lawyers
     if data["userType"] == "lawyer" and "barNumber" in data:
         new_user["barNumber"] = data["barNumber"]
@@ -60,8 +93,15 @@ def login():
     user = db.users.find_one({"email": data["email"]})
     
     # Check if user exists and password is correct
-    if not user or not bcrypt.check_password_hash(user["password"], data["password"]):
-        return jsonify({"message": "Invalid email or password"}), 401
+    try:
+        if not user or not password_hasher.verify_password(data["password"], user["password"]):
+            return jsonify({"message": "Invalid email or password"}), 401
+    except PasswordHasherBusy:
+        return _hasher_busy()
+    
+    # Bring hashes made with an older cost factor up to date
+    if needs_rehash(user["password"]):
+        _upgrade_password_hash(db, user, data["password"])
     
     # Prepare user data for token - simpler identity for JWT
     user_id = str(user["_id"])
@@ -108,8 +148,8 @@ def get_me():
         del user_data["password"]  # Don't send password hash
         
         return jsonify(user_data), 200
-    except Exception as e:
-        print(f"Error in /me endpoint: {str(e)}")
+    except Exception:
+        logger.exception("Error in /me endpoint")
         return jsonify({"message": "Error retrieving user data"}), 500
 
 @auth_bp.route("/logout", methods=["POST"])
@@ -129,13 +169,19 @@ def logout():
                 options={"verify_signature": True}
             )
             jti = decoded_token["jti"]
+            expires_at = datetime.utcfromtimestamp(decoded_token["exp"])
             
             # Add the token to the revoked tokens list
-            db.revoked_tokens.insert_one({"jti": jti, "created_at": datetime.utcnow()})
+            db.revoked_tokens.insert_one({
+                "jti": jti,
+                "created_at": datetime.utcnow(),
+                "expires_at": expires_at
+            })
+            revoked_token_cache.add(jti, expires_at)
             
             return jsonify({"message": "Successfully logged out"}), 200
-        except Exception as e:
-            print(f"Logout error: {str(e)}")
+        except Exception:
+            logger.exception("Logout error")
             # Even if there's an error, we tell the client logout was successful
             # as the client side is already clearing tokens
             pass
@@ -1,16 +1,34 @@
 # routes/case_routes.py
+import logging
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from datetime import datetime
 from bson.objectid import ObjectId
-import os
 from werkzeug.utils import secure_filename
-from database.db import get_db, serialize_doc
-from utils.gemini_classifier import classify_case_sync
+from database.db import get_db, get_read_db, serialize_doc
+from database.users import load_users, full_name
+from utils.auth import role_required, load_current_user
+from database.case_schema import summary_projection, urgency_rank
+from database.comments import get_case_comments, attach_recent_comments, attach_bucket_comments
+from utils import case_state
+from utils.case_state import CaseTransitionError
+from utils.pagination import paginate, parse_limit
+from utils.http_cache import list_etag, not_modified, with_etag
+from database.counters import record_case_created
+from utils.events import publish_case_event, CASE_CREATED
+from utils.classification_jobs import enqueue_classification, worker_pool
+from utils.gemini_classifier import CASE_CATEGORIES
+from utils.document_store import store_upload, release_document
+from utils.text_extraction import index_case_documents_async
+
+logger = logging.getLogger(__name__)
 
 # Create blueprint
 case_bp = Blueprint('case', __name__)
 
+# Search results are ranked, so only the top of the ranking can be paged through
+MAX_SEARCH_RESULTS = 1000
+
 # Allowed file extensions
 ALLOWED_EXTENSIONS = {'pdf', 'docx', 'jpg', 'jpeg'}
 
@@ -27,29 +45,35 @@ def report_case():
         db = get_db()
         
         # Verify user exists
-        user = db.users.find_one({"_id": ObjectId(user_id)})
+        user = load_current_user()
         if not user:
             return jsonify({"message": "User not found"}), 404
         
         # Get form data from request
         data = request.form
         
-        # Use Gemini to classify the case based on the description
         description = data.get("description", "")
         
-        # If the user provided a category and we want to override, we can use it
-        # Otherwise, use Gemini to classify
-        if data.get("category") and data.get("category").strip():
-            category = data.get("category")
+        # If the user picked a known category, use it. Otherwise the case is
+        # queued for Gemini classification once it has been saved. Only known
+        # categories are accepted: they become field names in the dashboard
+        # counters, where "." or "$" would break the update.
+        category = (data.get("category") or "").strip().lower()
+        if category in CASE_CATEGORIES:
+            classification_status = "done"
         else:
-            category = classify_case_sync(description)
+            category = None
+            classification_status = "pending"
         
         # Create a new case document
         new_case = {
             "title": data.get("title"),
             "description": description,
-            "category": category,  # Use the classified category
+            "category": category,  # Filled in by the classification worker if pending
+            "classificationStatus": classification_status,
+            "classificationSource": "user" if category else None,  # "local" or "gemini" once classified
             "urgencyLevel": data.get("urgencyLevel"),
+            "urgencyRank": urgency_rank(data.get("urgencyLevel")),
             "communicationMethod": data.get("communicationMethod"),
             "specialRequirements": data.get("specialRequirements", ""),
             "clientId": ObjectId(user_id),
@@ -59,40 +83,50 @@ def report_case():
             "updated_at": datetime.utcnow(),
             "assignedLawyer": None,
             "documents": [],
-            "aiClassified": category != data.get("category")  # Flag if AI classified
+            "aiClassified": classification_status == "pending"  # Flag if AI classified
         }
         
-        # Handle file uploads if any
-        if 'documents' in request.files:
-            uploaded_files = request.files.getlist('documents')
-            document_paths = []
-            
-            for file in uploaded_files:
-                if file and allowed_file(file.filename):
-                    # Create uploads directory if it doesn't exist
-                    upload_dir = os.path.join('uploads', user_id)
-                    if not os.path.exists(upload_dir):
-                        os.makedirs(upload_dir, exist_ok=True)
+        # Store uploaded files by content (identical files are kept once), then
+        # save the case. If anything fails before the case is saved, the
+        # references taken on the files stored so far are given back.
+        try:
+            if 'documents' in request.files:
+                for file in request.files.getlist('documents'):
+                    if file and allowed_file(file.filename):
+                        filename = secure_filename(file.filename)
+                        stored = store_upload(db, file)
                         
-                    # Secure the filename and save the file
-                    filename = secure_filename(file.filename)
-                    timestamp = datetime.utcnow().strftime('%Y%m%d%H%M%S')
-                    unique_filename = f"{timestamp}_{filename}"
-                    file_path = os.path.join(upload_dir, unique_filename)
-                    file.save(file_path)
-                    
-                    # Add file info to the documents list
-                    document_paths.append({
-                        "filename": filename,
-                        "path": file_path,
-                        "uploadedAt": datetime.utcnow()
-                    })
+                        # Add file info to the documents list
+                        new_case["documents"].append({
+                            "filename": filename,
+                            "sha256": stored["sha256"],
+                            "size": stored["size"],
+                            "contentType": stored["contentType"],
+                            "path": stored["path"],
+                            "uploadedAt": datetime.utcnow()
+                        })
             
-            # Add document paths to the case
-            new_case["documents"] = document_paths
+            # Insert the case into the database
+            result = db.cases.insert_one(new_case)
+        except Exception:
+            for document in new_case["documents"]:
+                release_document(db, document["sha256"])
+            raise
+        
+        # Count the case on the client's dashboard
+        record_case_created(db, new_case)
         
-        # Insert the case into the database
-        result = db.cases.insert_one(new_case)
+        # Tell connected lawyers about the new case
+        publish_case_event(CASE_CREATED, new_case, broadcastRoles=["lawyer"])
+        
+        # Extract document text for search in the background
+        if new_case["documents"]:
+            index_case_documents_async(result.inserted_id, new_case["documents"])
+        
+        # Classify in the background so the request does not wait on Gemini
+        if classification_status == "pending":
+            enqueue_classification(db, result.inserted_id, description)
+            worker_pool.start()
         
         # Add the case to the user's cases list
         db.users.update_one(
@@ -104,51 +138,151 @@ def report_case():
             "message": "Case reported successfully",
             "caseId": str(result.inserted_id),
             "category": category,
-            "aiClassified": category != data.get("category"),
+            "aiClassified": new_case["aiClassified"],
+            "classificationStatus": classification_status,
             "created_at": new_case["created_at"].isoformat()
         }), 201
         
-    except Exception as e:
-        print(f"Error reporting case: {str(e)}")
+    except Exception:
+        logger.exception("Error reporting case")
         return jsonify({"message": "An error occurred while reporting the case"}), 500
 
 @case_bp.route("/client/cases", methods=["GET"])
-@jwt_required()
+@role_required("client")
 def get_client_cases():
     user_id = get_jwt_identity()
-    db = get_db()
+    db = get_read_db()
     
     try:
-        # Check if user exists and is a client
-        user = db.users.find_one({"_id": ObjectId(user_id)})
-        if not user or "client" not in user.get("roles", []):
-            return jsonify({"message": "Unauthorized"}), 403
-        
-        # Get all cases for this client
-        cases = list(db.cases.find({"clientId": ObjectId(user_id)}).sort("created_at", -1))
+        # Nothing to send if none of this client's cases changed since the last poll
+        query = {"clientId": ObjectId(user_id)}
+        etag = list_etag(db.cases, query)
+        cached = not_modified(etag)
+        if cached:
+            return cached
         
+        # Get one page of this client's cases, newest first
+        try:
+            limit = parse_limit(request.args)
+            cases, next_token = paginate(
+                db.cases,
+                query,
+                [("created_at", -1), ("_id", -1)],
+                limit,
+                cursor=request.args.get("next"),
+                projection=summary_projection
+            )
+        except ValueError:
+            return jsonify({"message": "Invalid pagination parameters"}), 400
+
+        # Fetch all assigned lawyers in one query
+        lawyers = load_users(db, (case.get("assignedLawyer") for case in cases))
+
         # Serialize the results - this fixes the ObjectId issue
         serialized_cases = []
         for case in cases:
             case_dict = serialize_doc(case)
-            
+
             # Handle lawyer data if present
-            if case.get("assignedLawyer"):
-                lawyer = db.users.find_one({"_id": case["assignedLawyer"]})
-                if lawyer:
-                    case_dict["assignedLawyer"] = {
-                        "name": f"{lawyer.get('firstName', '')} {lawyer.get('lastName', '')}",
-                        "id": str(lawyer["_id"]),
-                    }
+            lawyer = lawyers.get(case.get("assignedLawyer"))
+            if lawyer:
+                case_dict["assignedLawyer"] = {
+                    "name": full_name(lawyer),
+                    "id": str(lawyer["_id"]),
+                }
             
             serialized_cases.append(case_dict)
         
+        return with_etag(jsonify({
+            "cases": serialized_cases,
+            "next": next_token
+        }), etag), 200
+    except Exception:
+        logger.exception("Error getting client cases")
+        return jsonify({"message": "An error occurred while retrieving cases"}), 500
+
+@case_bp.route("/search", methods=["GET"])
+@jwt_required()
+def search_cases():
+    """Full-text search over the cases the current user can see, best matches first"""
+    user_id = get_jwt_identity()
+    db = get_read_db()
+    
+    try:
+        user = load_current_user()
+        if not user:
+            return jsonify({"message": "User not found"}), 404
+        
+        query_text = request.args.get("q", "").strip()
+        if not query_text:
+            return jsonify({"message": "Search query is required"}), 400
+        
+        try:
+            limit = parse_limit(request.args)
+            page = max(1, int(request.args.get("page", 1)))
+        except ValueError:
+            return jsonify({"message": "Invalid pagination parameters"}), 400
+        if page * limit > MAX_SEARCH_RESULTS:
+            return jsonify({"message": f"Only the first {MAX_SEARCH_RESULTS} results can be paged through"}), 400
+        
+        # Clients search their own cases, lawyers the cases assigned to them
+        scope = {}
+        user_roles = user.get("roles", [])
+        if "admin" not in user_roles:
+            if "lawyer" in user_roles:
+                scope["assignedLawyer"] = ObjectId(user_id)
+            else:
+                scope["clientId"] = ObjectId(user_id)
+        
+        # Only the best page * limit + 1 hits of each source can be on this page
+        top = page * limit + 1
+        text_query = {"$text": {"$search": query_text}}
+        scores = {}
+        cases_by_id = {}
+        for case in (
+            db.cases.find(dict(text_query, **scope), dict(summary_projection, score={"$meta": "textScore"}))
+            .sort([("score", {"$meta": "textScore"})])
+            .limit(top)
+        ):
+            scores[case["_id"]] = case.pop("score")
+            cases_by_id[case["_id"]] = case
+        
+        # Comments live in case_comments; a case scores by its best matching bucket.
+        # Buckets are limited to the user's cases before ranking, so other
+        # users' comments cannot crowd theirs out of the top hits.
+        comment_query = dict(text_query)
+        if scope:
+            comment_query["caseId"] = {"$in": db.cases.distinct("_id", scope)}
+        comment_scores = {}
+        for bucket in (
+            db.case_comments.find(comment_query, {"caseId": 1, "score": {"$meta": "textScore"}})
+            .sort([("score", {"$meta": "textScore"})])
+            .limit(top)
+        ):
+            case_id = bucket["caseId"]
+            comment_scores[case_id] = max(comment_scores.get(case_id, 0), bucket["score"])
+        
+        missing = [case_id for case_id in comment_scores if case_id not in cases_by_id]
+        if missing:
+            for case in db.cases.find(dict(scope, _id={"$in": missing}), summary_projection):
+                cases_by_id[case["_id"]] = case
+        for case_id, score in comment_scores.items():
+            if case_id in cases_by_id:
+                scores[case_id] = scores.get(case_id, 0) + score
+        
+        ranked = sorted(cases_by_id, key=lambda case_id: (-scores[case_id], case_id))
+        cases = [cases_by_id[case_id] for case_id in ranked[(page - 1) * limit:page * limit + 1]]
+        has_more = len(cases) > limit
+        cases = cases[:limit]
+        
         return jsonify({
-            "cases": serialized_cases
+            "cases": [serialize_doc(case) for case in cases],
+            "page": page,
+            "next": page + 1 if has_more and (page + 1) * limit <= MAX_SEARCH_RESULTS else None
         }), 200
-    except Exception as e:
-        print(f"Error getting client cases: {str(e)}")
-        return jsonify({"message": "An error occurred while retrieving cases"}), 500
+    except Exception:
+        logger.exception("Error searching cases")
+        return jsonify({"message": "An error occurred while searching cases"}), 500
 
 @case_bp.route("/case/<case_id>", methods=["GET"])
 @jwt_required()
@@ -158,13 +292,13 @@ def get_case_details(case_id):
     
     try:
         # Verify user exists
-        user = db.users.find_one({"_id": ObjectId(user_id)})
+        user = load_current_user()
         if not user:
             return jsonify({"message": "User not found"}), 404
         
         # Get the case from the database
         try:
-            case = db.cases.find_one({"_id": ObjectId(case_id)})
+            case = db.cases.find_one({"_id": ObjectId(case_id)}, {"documentsText": 0})
         except:
             return jsonify({"message": "Invalid case ID"}), 400
         
@@ -189,19 +323,62 @@ def get_case_details(case_id):
                     "id": str(lawyer["_id"]),
                 }
         
+        # Embed the newest page of comments; older pages come from /case/<case_id>/comments
+        attach_recent_comments(db, case_dict, case["_id"])
+        
         # Return the case details
         return jsonify(case_dict), 200
-    except Exception as e:
-        print(f"Error getting case details: {str(e)}")
+    except Exception:
+        logger.exception("Error getting case details")
         return jsonify({"message": "An error occurred while retrieving case details"}), 500
     
 
+@case_bp.route("/case/<case_id>/comments", methods=["GET"])
+@jwt_required()
+def get_comments(case_id):
+    """Get one page (bucket) of a case's comments, newest page first"""
+    user_id = get_jwt_identity()
+    db = get_db()
+    
+    try:
+        user = load_current_user()
+        if not user:
+            return jsonify({"message": "User not found"}), 404
+        
+        try:
+            case = db.cases.find_one({"_id": ObjectId(case_id)}, {"clientId": 1, "assignedLawyer": 1})
+        except:
+            return jsonify({"message": "Invalid case ID"}), 400
+        
+        if not case:
+            return jsonify({"message": "Case not found"}), 404
+        
+        # Same access rules as the case details
+        user_roles = user.get("roles", [])
+        if "admin" not in user_roles:
+            if "client" in user_roles and str(case.get("clientId")) != user_id:
+                return jsonify({"message": "Access denied"}), 403
+            if "lawyer" in user_roles and case.get("assignedLawyer") != ObjectId(user_id):
+                return jsonify({"message": "Access denied"}), 403
+        
+        try:
+            comments, next_token = get_case_comments(db, case["_id"], request.args.get("next"))
+        except ValueError:
+            return jsonify({"message": "Invalid pagination parameters"}), 400
+        
+        return jsonify({
+            "comments": serialize_doc(comments),
+            "next": next_token
+        }), 200
+    except Exception:
+        logger.exception("Error getting comments")
+        return jsonify({"message": "An error occurred while retrieving comments"}), 500
+
 @case_bp.route("/add-comment/<case_id>", methods=["POST"])
 @jwt_required()
 def add_comment(case_id):
     """Add a comment to a case"""
     try:
-        user_id = get_jwt_identity()
         db = get_db()
         
         # Get the comment from the request body
@@ -212,58 +389,21 @@ def add_comment(case_id):
             return jsonify({"message": "Comment cannot be empty"}), 400
         
         # Get the user
-        user = db.users.find_one({"_id": ObjectId(user_id)})
+        user = load_current_user()
         if not user:
             return jsonify({"message": "User not found"}), 404
         
-        # Get the case
+        # Bump the case and check access in one guarded update, then store the comment
         try:
-            case = db.cases.find_one({"_id": ObjectId(case_id)})
-        except:
-            return jsonify({"message": "Invalid case ID"}), 400
-        
-        if not case:
-            return jsonify({"message": "Case not found"}), 404
-        
-        # Check if the user is authorized to comment on this case
-        # Admin can comment on any case
-        is_authorized = "admin" in user.get("roles", [])
-        # Client can comment on their own cases
-        if not is_authorized and "client" in user.get("roles", []) and str(case.get("clientId")) == user_id:
-            is_authorized = True
-        # Lawyer can comment on cases assigned to them
-        if not is_authorized and "lawyer" in user.get("roles", []) and case.get("assignedLawyer") == ObjectId(user_id):
-            is_authorized = True
-            
-        if not is_authorized:
-            return jsonify({"message": "You are not authorized to comment on this case"}), 403
-        
-        # Create the comment
-        now = datetime.utcnow()
-        comment = {
-            "userId": ObjectId(user_id),
-            "userType": user.get("roles", ["client"])[0],  # Use the first role as the user type
-            "text": comment_text.strip(),
-            "timestamp": now
-        }
-        
-        # Add the comment to the case
-        db.cases.update_one(
-            {"_id": ObjectId(case_id)},
-            {
-                "$push": {"comments": comment},
-                "$set": {"updated_at": now}
-            }
-        )
-        
-        # Get the updated case
-        updated_case = db.cases.find_one({"_id": ObjectId(case_id)})
+            updated_case, bucket = case_state.add_comment(db, case_id, user, comment_text.strip())
+        except CaseTransitionError as e:
+            return jsonify({"message": e.message}), e.status_code
         
         return jsonify({
             "message": "Comment added successfully",
-            "case": serialize_doc(updated_case)
+            "case": attach_bucket_comments(serialize_doc(updated_case), bucket)
         }), 200
         
-    except Exception as e:
-        print(f"Error adding comment: {str(e)}")
+    except Exception:
+        logger.exception("Error adding comment")
         return jsonify({"message": "An error occurred while adding the comment"}), 500
\ No newline at end of file
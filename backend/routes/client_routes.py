@@ -1,45 +1,33 @@
 # routes/client_routes.py
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from bson.objectid import ObjectId
-from database.db import get_db
+import logging
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from database.db import get_db, get_read_db
+from database.counters import get_counters, dashboard_summary
+from database.lawyers import search_lawyers, lawyer_profile
+from utils.auth import role_required, load_current_user
+from utils.pagination import parse_limit
+
+logger = logging.getLogger(__name__)
 
 # Create blueprint
 client_bp = Blueprint('client', __name__)
 
 @client_bp.route("/dashboard", methods=["GET"])
-@jwt_required()
+@role_required("client")
 def client_dashboard():
-    user_id = get_jwt_identity()
-    db = get_db()
-    
-    # Get the user to check their role
-    user = db.users.find_one({"_id": ObjectId(user_id)})
-    
-    if not user or "client" not in user.get("roles", []):
-        return jsonify({"message": "Unauthorized"}), 403
-    
-    # In a real app, you would fetch client-specific data here
-    return jsonify({
-        "message": "Client dashboard data",
-        "cases": [
-            {"id": "1", "title": "Contract Review", "status": "In Progress"},
-            {"id": "2", "title": "Trademark Filing", "status": "Pending"}
-        ]
-    }), 200
+    """Case counts and recent activity for the current client"""
+    try:
+        db = get_db()
+        counters = get_counters(db, load_current_user()["_id"])
+        return jsonify(dict(dashboard_summary(counters), message="Client dashboard data")), 200
+    except Exception:
+        logger.exception("Error getting client dashboard")
+        return jsonify({"message": "An error occurred while retrieving the dashboard"}), 500
 
 @client_bp.route("/cases", methods=["GET"])
-@jwt_required()
+@role_required("client")
 def get_cases():
-    user_id = get_jwt_identity()
-    db = get_db()
-    
-    # Get the user to check their role
-    user = db.users.find_one({"_id": ObjectId(user_id)})
-    
-    if not user or "client" not in user.get("roles", []):
-        return jsonify({"message": "Unauthorized"}), 403
-    
     # In a real app, fetch cases from database
     # For now, return sample data
     return jsonify({
@@ -67,25 +55,39 @@ def report_case():
     # Implementation for reporting a new case
     return jsonify({"message": "Case reported successfully"}), 201
 
+def _optional_number(args, name, cast):
+    """Read an optional numeric query parameter; raises ValueError if malformed."""
+    value = args.get(name)
+    return cast(value) if value not in (None, "") else None
+
 @client_bp.route("/find-lawyers", methods=["GET"])
 @jwt_required()
 def find_lawyers():
-    # Implementation for finding lawyers
-    return jsonify({
-        "lawyers": [
-            {
-                "id": "1",
-                "name": "Jane Smith",
-                "specialization": "Contract Law",
-                "rating": 4.8,
-                "cases_handled": 45
-            },
-            {
-                "id": "2",
-                "name": "John Doe",
-                "specialization": "Intellectual Property",
-                "rating": 4.6,
-                "cases_handled": 38
-            }
-        ]
-    }), 200
+    """Search the lawyer directory: best rated and least busy first, optionally by specialization"""
+    try:
+        db = get_read_db()
+        
+        try:
+            limit = parse_limit(request.args)
+            min_rating = _optional_number(request.args, "minRating", float)
+            max_open_cases = _optional_number(request.args, "maxOpenCases", int)
+            min_experience = _optional_number(request.args, "minExperience", int)
+            lawyers, next_token = search_lawyers(
+                db,
+                limit,
+                cursor=request.args.get("next"),
+                specialization=(request.args.get("specialization") or "").strip().lower() or None,
+                min_rating=min_rating,
+                max_open_cases=max_open_cases,
+                min_experience=min_experience
+            )
+        except ValueError:
+            return jsonify({"message": "Invalid search parameters"}), 400
+        
+        return jsonify({
+            "lawyers": [lawyer_profile(lawyer) for lawyer in lawyers],
+            "next": next_token
+        }), 200
+    except Exception:
+        logger.exception("Error finding lawyers")
+        return jsonify({"message": "An error occurred while searching for lawyers"}), 500
@@ -1,50 +1,148 @@
 # routes/document_routes.py
-from flask import Blueprint, request, send_file, jsonify
+import logging
+from flask import Blueprint, request, send_file, jsonify, current_app, Response
 from flask_jwt_extended import jwt_required, get_jwt_identity
 import os
+import threading
+import time
+from collections import OrderedDict
 from database.db import get_db
 from bson.objectid import ObjectId
+from utils.auth import load_current_user, QUERY_TOKEN_LOCATIONS
+
+logger = logging.getLogger(__name__)
 
 # Create blueprint
 document_bp = Blueprint('document', __name__)
-@document_bp.route("/download", methods=["GET"])
-def download_document():
-    """Download a document from the server"""
+
+# Downloaded documents never change, so browsers may reuse them for a day
+DOWNLOAD_MAX_AGE = 24 * 3600
+
+class CaseDocumentCache:
+    """
+    Short-lived cache of the fields needed to authorize and serve a case's
+    documents, so repeated and resumed downloads skip the case lookup.
+    Assignment can change, hence the TTL.
+    """
+
+    def __init__(self, ttl=30.0, max_size=5000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db, case_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(case_id)
+            if entry and entry[0] > now:
+                return entry[1]
+
+        case = db.cases.find_one(
+            {"_id": ObjectId(case_id)},
+            {"clientId": 1, "assignedLawyer": 1, "documents": 1}
+        )
+        if case is not None:
+            with self._lock:
+                self._entries[case_id] = (now + self.ttl, case)
+                self._entries.move_to_end(case_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return case
+
+case_document_cache = CaseDocumentCache()
+
+def _find_document(case, document_ref):
+    """Look a document up by its sha256, or by its index for files stored before hashing."""
+    documents = case.get("documents", [])
+    for document in documents:
+        if document.get("sha256") == document_ref:
+            return document
+    if document_ref.isdigit() and int(document_ref) < len(documents):
+        return documents[int(document_ref)]
+    return None
+
+def _offloaded_response(document, file_path, mode):
+    """Let the front proxy send the file; Python only sets the headers."""
+    response = Response(status=200, mimetype=document.get("contentType") or "application/octet-stream")
+    if mode == "x-accel-redirect":
+        prefix = current_app.config["DOCUMENT_ACCEL_PREFIX"].rstrip("/")
+        relative = os.path.relpath(file_path, os.path.join(os.getcwd(), "uploads"))
+        response.headers["X-Accel-Redirect"] = f"{prefix}/{relative}"
+    else:
+        response.headers["X-Sendfile"] = file_path
+    response.headers["Content-Disposition"] = f'attachment; filename="{document["filename"]}"'
+    if document.get("sha256"):
+        response.set_etag(document["sha256"])
+    if document.get("uploadedAt"):
+        response.last_modified = document["uploadedAt"]
+    response.cache_control.private = True
+    response.cache_control.max_age = DOWNLOAD_MAX_AGE
+    return response.make_conditional(request)
+
+@document_bp.route("/case/<case_id>/<document_ref>", methods=["GET"])
+@jwt_required(locations=QUERY_TOKEN_LOCATIONS)
+def download_case_document(case_id, document_ref):
+    """
+    Download a case document by sha256 (or index for older uploads).
+
+    Supports If-None-Match / If-Modified-Since (304) and Range requests.
+    With DOCUMENT_SENDFILE_MODE set to "x-accel-redirect" or "x-sendfile"
+    the bytes are served by the front proxy instead of a Python worker.
+    """
     try:
+        user_id = get_jwt_identity()
         db = get_db()
-        
-        # Get the file path from the query parameters
-        file_path = request.args.get('path')
-        if not file_path:
-            return jsonify({"message": "No file path provided"}), 400
-        
-        # Normalize the path - handle both relative and absolute paths
-        base_dir = os.getcwd()
-        
-        # If the path doesn't include the full base directory, prepend it
-        if not os.path.isabs(file_path):
-            file_path = os.path.join(base_dir, file_path)
-        
-        # Security check: Make sure the path is within the uploads directory
-        uploads_dir = os.path.join(base_dir, "uploads")
-        normalized_path = os.path.normpath(file_path)
-        normalized_uploads = os.path.normpath(uploads_dir)
-        
-        # Check if the normalized path starts with the normalized uploads directory
-        if not normalized_path.startswith(normalized_uploads):
-            print(f"Security error: Path {normalized_path} is not within {normalized_uploads}")
-            return jsonify({"message": "Invalid file path"}), 403
-        
-        # Check if file exists
-        if not os.path.exists(normalized_path):
-            return jsonify({"message": f"File not found on server: {normalized_path}"}), 404
-        
-        # Get the filename from the file path
-        filename = os.path.basename(normalized_path)
-        
-        # Return the file as an attachment
-        return send_file(normalized_path, as_attachment=True, download_name=filename)
-        
-    except Exception as e:
-        print(f"Error downloading document: {str(e)}")
-        return jsonify({"message": "An error occurred while downloading the document"}), 500
\ No newline at end of file
+
+        user = load_current_user()
+        if not user:
+            return jsonify({"message": "User not found"}), 404
+
+        try:
+            case = case_document_cache.get(db, case_id)
+        except:
+            return jsonify({"message": "Invalid case ID"}), 400
+
+        if not case:
+            return jsonify({"message": "Case not found"}), 404
+
+        # Same access rules as the case details endpoint
+        user_roles = user.get("roles", [])
+        if "admin" not in user_roles:
+            if "client" in user_roles and str(case.get("clientId")) != user_id:
+                return jsonify({"message": "Access denied"}), 403
+            if "lawyer" in user_roles and case.get("assignedLawyer") != ObjectId(user_id):
+                return jsonify({"message": "Access denied"}), 403
+
+        document = _find_document(case, document_ref)
+        if not document:
+            return jsonify({"message": "Document not found"}), 404
+
+        file_path = os.path.normpath(os.path.join(os.getcwd(), document["path"]))
+
+        mode = current_app.config.get("DOCUMENT_SENDFILE_MODE", "")
+        if mode in ("x-accel-redirect", "x-sendfile"):
+            return _offloaded_response(document, file_path, mode)
+
+        if not os.path.isfile(file_path):
+            return jsonify({"message": "File not found on server"}), 404
+
+        # send_file answers conditional and Range requests itself
+        response = send_file(
+            file_path,
+            mimetype=document.get("contentType"),
+            as_attachment=True,
+            download_name=document["filename"],
+            conditional=True,
+            etag=document.get("sha256", True),
+            last_modified=document.get("uploadedAt"),
+            max_age=DOWNLOAD_MAX_AGE
+        )
+        # Downloads are per-user, so keep them out of shared caches
+        response.cache_control.public = False
+        response.cache_control.private = True
+        return response
+
+    except Exception:
+        logger.exception("Error downloading case document")
+        return jsonify({"message": "An error occurred while downloading the document"}), 500
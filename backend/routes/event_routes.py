@@ -0,0 +1,74 @@
+# routes/event_routes.py
+import logging
+from flask import Blueprint, Response, current_app, stream_with_context, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from bson.objectid import ObjectId
+import os
+import time
+from utils.auth import load_current_user, QUERY_TOKEN_LOCATIONS
+from utils.events import event_bus, visible_to
+
+logger = logging.getLogger(__name__)
+
+# Create blueprint
+event_bp = Blueprint('event', __name__)
+
+# A comment line is sent when nothing happened for this long, so proxies
+# keep the connection open and dead clients are noticed
+HEARTBEAT_SECONDS = 15
+
+# Streams end after this long; EventSource reconnects on its own, which
+# also re-checks the token
+STREAM_MAX_SECONDS = int(os.getenv("EVENT_STREAM_MAX_SECONDS", "300"))
+
+# Fields only used to route events
+_ROUTING_FIELDS = ("broadcastRoles",)
+
+def _format_event(event):
+    payload = {key: value for key, value in event.items() if key not in _ROUTING_FIELDS and key != "_id"}
+    data = current_app.json.dumps(payload)
+    return f"event: {event['type']}\ndata: {data}\n\n"
+
+@event_bp.route("/stream", methods=["GET"])
+@jwt_required(locations=QUERY_TOKEN_LOCATIONS)
+def stream_events():
+    """
+    Server-sent events for the current user's cases: case-created,
+    case-assigned, status-changed and comment-added. Lawyers also receive
+    case-created and case-assigned for the whole pending pool.
+
+    EventSource cannot set headers, so pass the token as ?jwt=<token>.
+    Each open stream holds a worker thread; run with threaded workers or
+    serve_async.py, where a stream only holds a greenlet.
+    """
+    try:
+        user = load_current_user()
+        if not user:
+            return jsonify({"message": "User not found"}), 404
+
+        user_id = ObjectId(get_jwt_identity())
+        roles = user.get("roles", [])
+        subscription = event_bus.subscribe()
+    except Exception:
+        logger.exception("Error opening event stream")
+        return jsonify({"message": "An error occurred while opening the event stream"}), 500
+
+    def generate():
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        try:
+            # Ask EventSource to wait a few seconds before reconnecting
+            yield "retry: 3000\n\n"
+            while time.monotonic() < deadline and not subscription.overflowed:
+                event = subscription.get(timeout=HEARTBEAT_SECONDS)
+                if event is None:
+                    yield ": keepalive\n\n"
+                elif visible_to(event, user_id, roles):
+                    yield _format_event(event)
+        finally:
+            subscription.close()
+
+    response = Response(stream_with_context(generate()), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
@@ -1,168 +1,182 @@
 # routes/lawyer_case_routes.py
+import logging
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from datetime import datetime
+from flask_jwt_extended import get_jwt_identity
 from bson.objectid import ObjectId
-from database.db import get_db, serialize_doc
+from database.db import get_db, get_read_db, serialize_doc
+from database.users import load_users, full_name
+from utils.auth import role_required, load_current_user
+from database.case_schema import summary_projection, DISPATCH_SORT
+from database.comments import attach_recent_comments, attach_bucket_comments
+from utils import case_state
+from utils.case_state import CaseTransitionError
+from utils.pagination import paginate, parse_limit
+from utils.http_cache import list_etag, not_modified, with_etag
+
+logger = logging.getLogger(__name__)
 
 # Create blueprint
 lawyer_case_bp = Blueprint('lawyer_case', __name__)
 
 @lawyer_case_bp.route("/available-cases", methods=["GET"])
-@jwt_required()
+@role_required("lawyer")
 def get_available_cases():
     """Get all available cases that are pending lawyer assignment"""
     try:
-        user_id = get_jwt_identity()
-        db = get_db()
+        db = get_read_db()
         
-        # Check if user exists and is a lawyer
-        user = db.users.find_one({"_id": ObjectId(user_id)})
-        if not user or "lawyer" not in user.get("roles", []):
-            return jsonify({"message": "Unauthorized"}), 403
+        # Nothing to send if the pool has not changed since the last poll
+        query = {"status": "Pending", "assignedLawyer": None}
+        etag = list_etag(db.cases, query)
+        cached = not_modified(etag)
+        if cached:
+            return cached
         
-        # Get cases that are pending and not assigned to any lawyer
-        cases = list(db.cases.find({
-            "status": "Pending",
-            "assignedLawyer": None
-        }).sort("urgencyLevel", -1).sort("created_at", -1))
+        # Get one page of cases that are pending and not assigned to any lawyer,
+        # most urgent first and then the longest waiting
+        try:
+            limit = parse_limit(request.args)
+            cases, next_token = paginate(
+                db.cases,
+                query,
+                DISPATCH_SORT,
+                limit,
+                cursor=request.args.get("next"),
+                projection=summary_projection
+            )
+        except ValueError:
+            return jsonify({"message": "Invalid pagination parameters"}), 400
         
+        # Fetch all clients in one query
+        clients = load_users(db, (case.get("clientId") for case in cases))
+
         # Serialize the results
         serialized_cases = []
         for case in cases:
             case_dict = serialize_doc(case)
-            
+
             # Add client info
-            if case.get("clientId"):
-                client = db.users.find_one({"_id": case["clientId"]})
-                if client:
-                    case_dict["client"] = {
-                        "name": client.get("firstName", "") + " " + client.get("lastName", ""),
-                        "contactPerson": client.get("email", "")
-                    }
+            client = clients.get(case.get("clientId"))
+            if client:
+                case_dict["client"] = {
+                    "name": full_name(client),
+                    "contactPerson": client.get("email", "")
+                }
             
             serialized_cases.append(case_dict)
         
-        return jsonify({
-            "cases": serialized_cases
-        }), 200
-    except Exception as e:
-        print(f"Error getting available cases: {str(e)}")
+        return with_etag(jsonify({
+            "cases": serialized_cases,
+            "next": next_token
+        }), etag), 200
+    except Exception:
+        logger.exception("Error getting available cases")
         return jsonify({"message": "An error occurred while retrieving available cases"}), 500
 
 @lawyer_case_bp.route("/assigned-cases", methods=["GET"])
-@jwt_required()
+@role_required("lawyer")
 def get_assigned_cases():
     """Get all cases assigned to the current lawyer"""
     try:
         user_id = get_jwt_identity()
-        db = get_db()
+        db = get_read_db()
         
-        # Check if user exists and is a lawyer
-        user = db.users.find_one({"_id": ObjectId(user_id)})
-        if not user or "lawyer" not in user.get("roles", []):
-            return jsonify({"message": "Unauthorized"}), 403
+        # Nothing to send if none of this lawyer's cases changed since the last poll
+        query = {"assignedLawyer": ObjectId(user_id)}
+        etag = list_etag(db.cases, query)
+        cached = not_modified(etag)
+        if cached:
+            return cached
         
-        # Get cases assigned to this lawyer
-        cases = list(db.cases.find({
-            "assignedLawyer": ObjectId(user_id)
-        }).sort("updated_at", -1))
+        # Get one page of cases assigned to this lawyer, most recently updated first
+        try:
+            limit = parse_limit(request.args)
+            cases, next_token = paginate(
+                db.cases,
+                query,
+                [("updated_at", -1), ("_id", -1)],
+                limit,
+                cursor=request.args.get("next"),
+                projection=summary_projection
+            )
+        except ValueError:
+            return jsonify({"message": "Invalid pagination parameters"}), 400
         
+        # Fetch all clients in one query
+        clients = load_users(db, (case.get("clientId") for case in cases))
+
         # Serialize the results
         serialized_cases = []
         for case in cases:
             case_dict = serialize_doc(case)
-            
+
             # Add client info
-            if case.get("clientId"):
-                client = db.users.find_one({"_id": case["clientId"]})
-                if client:
-                    case_dict["client"] = {
-                        "name": client.get("firstName", "") + " " + client.get("lastName", ""),
-                        "contactPerson": client.get("email", "")
-                    }
+            client = clients.get(case.get("clientId"))
+            if client:
+                case_dict["client"] = {
+                    "name": full_name(client),
+                    "contactPerson": client.get("email", "")
+                }
             
             serialized_cases.append(case_dict)
         
-        return jsonify({
-            "cases": serialized_cases
-        }), 200
-    except Exception as e:
-        print(f"Error getting assigned cases: {str(e)}")
+        return with_etag(jsonify({
+            "cases": serialized_cases,
+            "next": next_token
+        }), etag), 200
+    except Exception:
+        logger.exception("Error getting assigned cases")
         return jsonify({"message": "An error occurred while retrieving assigned cases"}), 500
 
 @lawyer_case_bp.route("/accept-case/<case_id>", methods=["POST"])
-@jwt_required()
+@role_required("lawyer")
 def accept_case(case_id):
     """Accept a case and assign it to the current lawyer"""
     try:
-        user_id = get_jwt_identity()
         db = get_db()
+        user = load_current_user()
         
-        # Check if user exists and is a lawyer
-        user = db.users.find_one({"_id": ObjectId(user_id)})
-        if not user or "lawyer" not in user.get("roles", []):
-            return jsonify({"message": "Unauthorized"}), 403
-        
-        # Get the case
+        # Assign the case, guarded by it still being pending and unassigned
         try:
-            case = db.cases.find_one({"_id": ObjectId(case_id)})
-        except:
-            return jsonify({"message": "Invalid case ID"}), 400
-        
-        if not case:
-            return jsonify({"message": "Case not found"}), 404
-        
-        # Check if case is already assigned
-        if case.get("assignedLawyer") is not None:
-            return jsonify({"message": "Case is already assigned to a lawyer"}), 400
-        
-        # Update the case
-        now = datetime.utcnow()
-        update_result = db.cases.update_one(
-            {"_id": ObjectId(case_id), "assignedLawyer": None},
-            {
-                "$set": {
-                    "assignedLawyer": ObjectId(user_id),
-                    "status": "Assigned",
-                    "updated_at": now,
-                    "assignedAt": now
-                }
-            }
-        )
-        
-        if update_result.modified_count == 0:
-            return jsonify({"message": "Case could not be assigned. It may have been assigned to another lawyer."}), 400
-        
-        # Add a comment to the case
-        lawyer_name = f"{user.get('firstName', '')} {user.get('lastName', '')}"
-        db.cases.update_one(
-            {"_id": ObjectId(case_id)},
-            {
-                "$push": {
-                    "comments": {
-                        "userId": ObjectId(user_id),
-                        "userType": "lawyer",
-                        "text": f"Case accepted by {lawyer_name}",
-                        "timestamp": now
-                    }
-                }
-            }
-        )
-        
-        # Get the updated case
-        updated_case = db.cases.find_one({"_id": ObjectId(case_id)})
+            updated_case, bucket = case_state.accept_case(db, case_id, user)
+        except CaseTransitionError as e:
+            return jsonify({"message": e.message}), e.status_code
         
         return jsonify({
             "message": "Case accepted successfully",
-            "case": serialize_doc(updated_case)
+            "case": attach_bucket_comments(serialize_doc(updated_case), bucket)
         }), 200
-    except Exception as e:
-        print(f"Error accepting case: {str(e)}")
+    except Exception:
+        logger.exception("Error accepting case")
         return jsonify({"message": "An error occurred while accepting the case"}), 500
 
+@lawyer_case_bp.route("/claim-next", methods=["POST"])
+@role_required("lawyer")
+def claim_next_case():
+    """Take the most urgent pending case, optionally within a category"""
+    try:
+        db = get_db()
+        user = load_current_user()
+        
+        data = request.get_json(silent=True) or {}
+        category = (data.get("category") or request.args.get("category") or "").strip().lower() or None
+        
+        # Pick and assign the case in one update, so lawyers never race for it
+        try:
+            claimed_case, bucket = case_state.claim_next_case(db, user, category)
+        except CaseTransitionError as e:
+            return jsonify({"message": e.message}), e.status_code
+        
+        return jsonify({
+            "message": "Case claimed successfully",
+            "case": attach_bucket_comments(serialize_doc(claimed_case), bucket)
+        }), 200
+    except Exception:
+        logger.exception("Error claiming next case")
+        return jsonify({"message": "An error occurred while claiming a case"}), 500
+
 @lawyer_case_bp.route("/update-case-status/<case_id>", methods=["POST"])
-@jwt_required()
+@role_required("lawyer")
 def update_case_status(case_id):
     """Update the status of a case assigned to the current lawyer"""
     try:
@@ -173,69 +187,25 @@ def update_case_status(case_id):
         if not new_status:
             return jsonify({"message": "Status is required"}), 400
         
-        if new_status not in ["InProgress", "OnHold", "Closed"]:
-            return jsonify({"message": "Invalid status"}), 400
-        
         user_id = get_jwt_identity()
         db = get_db()
         
-        # Check if user exists and is a lawyer
-        user = db.users.find_one({"_id": ObjectId(user_id)})
-        if not user or "lawyer" not in user.get("roles", []):
-            return jsonify({"message": "Unauthorized"}), 403
-        
-        # Get the case
+        # Change the status, guarded by assignment and the allowed prior statuses
         try:
-            case = db.cases.find_one({"_id": ObjectId(case_id)})
-        except:
-            return jsonify({"message": "Invalid case ID"}), 400
-        
-        if not case:
-            return jsonify({"message": "Case not found"}), 404
-        
-        # Check if case is assigned to this lawyer
-        if str(case.get("assignedLawyer")) != user_id:
-            return jsonify({"message": "You are not assigned to this case"}), 403
-        
-        # Update the case status
-        now = datetime.utcnow()
-        update_result = db.cases.update_one(
-            {"_id": ObjectId(case_id), "assignedLawyer": ObjectId(user_id)},
-            {
-                "$set": {
-                    "status": new_status,
-                    "updated_at": now
-                }
-            }
-        )
-        
-        if update_result.modified_count == 0:
-            return jsonify({"message": "Case status could not be updated"}), 400
-        
-        # Add a comment to the case if provided
-        if comment:
-            lawyer_name = f"{user.get('firstName', '')} {user.get('lastName', '')}"
-            db.cases.update_one(
-                {"_id": ObjectId(case_id)},
-                {
-                    "$push": {
-                        "comments": {
-                            "userId": ObjectId(user_id),
-                            "userType": "lawyer",
-                            "text": comment,
-                            "timestamp": now
-                        }
-                    }
-                }
-            )
+            updated_case, bucket = case_state.change_status(db, case_id, user_id, new_status, comment)
+        except CaseTransitionError as e:
+            return jsonify({"message": e.message}), e.status_code
         
-        # Get the updated case
-        updated_case = db.cases.find_one({"_id": ObjectId(case_id)})
+        case_dict = serialize_doc(updated_case)
+        if bucket:
+            attach_bucket_comments(case_dict, bucket)
+        else:
+            attach_recent_comments(db, case_dict, updated_case["_id"])
         
         return jsonify({
             "message": "Case status updated successfully",
-            "case": serialize_doc(updated_case)
+            "case": case_dict
         }), 200
-    except Exception as e:
-        print(f"Error updating case status: {str(e)}")
+    except Exception:
+        logger.exception("Error updating case status")
         return jsonify({"message": "An error occurred while updating the case status"}), 500
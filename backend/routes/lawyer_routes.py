@@ -1,46 +1,34 @@
 # routes/lawyer_routes.py
-from flask import Blueprint, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from bson.objectid import ObjectId
+import logging
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required
+from pymongo import ReturnDocument
 from database.db import get_db
+from database.counters import get_counters, dashboard_summary
+from database.lawyers import PROFILE_PROJECTION, EDITABLE_FIELDS, lawyer_profile
+from utils.auth import role_required, load_current_user, invalidate_user
+from utils.gemini_classifier import CASE_CATEGORIES
+
+logger = logging.getLogger(__name__)
 
 # Create blueprint
 lawyer_bp = Blueprint('lawyer', __name__)
 
 @lawyer_bp.route("/dashboard", methods=["GET"])
-@jwt_required()
+@role_required("lawyer")
 def lawyer_dashboard():
-    user_id = get_jwt_identity()
-    db = get_db()
-    
-    # Get the user to check their role
-    user = db.users.find_one({"_id": ObjectId(user_id)})
-    
-    if not user or "lawyer" not in user.get("roles", []):
-        return jsonify({"message": "Unauthorized"}), 403
-    
-    # In a real app, you would fetch lawyer-specific data here
-    return jsonify({
-        "message": "Lawyer dashboard data",
-        "cases": [
-            {"id": "1", "title": "Client A - Contract Review", "status": "In Progress"},
-            {"id": "2", "title": "Client B - Trademark Filing", "status": "Pending"},
-            {"id": "3", "title": "Client C - Legal Consultation", "status": "Completed"}
-        ]
-    }), 200
+    """Workload, case counts and recent activity for the current lawyer"""
+    try:
+        db = get_db()
+        counters = get_counters(db, load_current_user()["_id"])
+        return jsonify(dict(dashboard_summary(counters), message="Lawyer dashboard data")), 200
+    except Exception:
+        logger.exception("Error getting lawyer dashboard")
+        return jsonify({"message": "An error occurred while retrieving the dashboard"}), 500
 
 @lawyer_bp.route("/available-cases", methods=["GET"])
-@jwt_required()
+@role_required("lawyer")
 def available_cases():
-    user_id = get_jwt_identity()
-    db = get_db()
-    
-    # Get the user to check their role
-    user = db.users.find_one({"_id": ObjectId(user_id)})
-    
-    if not user or "lawyer" not in user.get("roles", []):
-        return jsonify({"message": "Unauthorized"}), 403
-    
     # In a real app, fetch available cases from database
     # For now, return sample data
     return jsonify({
@@ -85,33 +73,77 @@ def accept_case(case_id):
     }), 200
 
 @lawyer_bp.route("/profile", methods=["GET"])
-@jwt_required()
+@role_required("lawyer")
 def get_profile():
-    user_id = get_jwt_identity()
+    """Get the current lawyer's directory profile"""
+    user_id = load_current_user()["_id"]
     db = get_db()
     
-    # Get the lawyer profile
-    user = db.users.find_one({"_id": ObjectId(user_id)})
-    
-    if not user or "lawyer" not in user.get("roles", []):
-        return jsonify({"message": "Unauthorized"}), 403
-    
-    # In a real app, fetch complete profile data
-    profile = {
-        "id": str(user["_id"]),
-        "name": f"{user['firstName']} {user['lastName']}",
-        "email": user["email"],
-        "barNumber": user.get("barNumber", ""),
-        "specializations": user.get("specializations", []),
-        "bio": user.get("bio", ""),
-        "experience": user.get("experience", ""),
-        "rating": user.get("rating", 0)
-    }
-    
-    return jsonify(profile), 200
+    try:
+        user = db.users.find_one({"_id": user_id}, PROFILE_PROJECTION)
+        if not user:
+            return jsonify({"message": "User not found"}), 404
+        
+        return jsonify(lawyer_profile(user)), 200
+    except Exception:
+        logger.exception("Error getting lawyer profile")
+        return jsonify({"message": "An error occurred while retrieving the profile"}), 500
+
+def _validate_profile_update(data):
+    """Return (fields to $set, error message) for a profile update body."""
+    updates = {}
+    for field in EDITABLE_FIELDS & set(data):
+        value = data[field]
+        if field == "specializations":
+            if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                return None, "Specializations must be a list of categories"
+            value = sorted({item.strip().lower() for item in value if item.strip()})
+            unknown = [item for item in value if item not in CASE_CATEGORIES]
+            if unknown:
+                return None, f"Unknown specializations: {', '.join(unknown)}"
+        elif field == "experience":
+            if isinstance(value, bool) or not isinstance(value, int) or value < 0:
+                return None, "Experience must be a non-negative number of years"
+        else:
+            if not isinstance(value, str):
+                return None, f"{field} must be a string"
+            value = value.strip()
+            if field in ("firstName", "lastName") and not value:
+                return None, f"{field} cannot be empty"
+        updates[field] = value
+    return updates, None
 
 @lawyer_bp.route("/profile", methods=["PUT"])
-@jwt_required()
+@role_required("lawyer")
 def update_profile():
-    # Implementation for updating lawyer profile
-    return jsonify({"message": "Profile updated successfully"}), 200
+    """Update the current lawyer's directory profile"""
+    user_id = load_current_user()["_id"]
+    db = get_db()
+    
+    try:
+        data = request.get_json() or {}
+        updates, error = _validate_profile_update(data)
+        if error:
+            return jsonify({"message": error}), 400
+        if not updates:
+            return jsonify({"message": "No profile fields to update"}), 400
+        
+        user = db.users.find_one_and_update(
+            {"_id": user_id},
+            {"$set": updates},
+            projection=PROFILE_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+        if not user:
+            return jsonify({"message": "User not found"}), 404
+        
+        # Names are cached for role checks and case listings
+        invalidate_user(user_id)
+        
+        return jsonify({
+            "message": "Profile updated successfully",
+            "profile": lawyer_profile(user)
+        }), 200
+    except Exception:
+        logger.exception("Error updating lawyer profile")
+        return jsonify({"message": "An error occurred while updating the profile"}), 500
@@ -1,16 +1,43 @@
 # routes/test_routes.py
 from flask import Blueprint, request, jsonify
-from utils.gemini_classifier import classify_case_sync
+from utils.gemini_classifier import classify_case_sync, classify_cases_batch
+from utils.classification_cache import classification_cache
 
 # Create test blueprint
 test_bp = Blueprint('test', __name__)
 
+# Upper bound on descriptions in one batch request
+MAX_BATCH_DESCRIPTIONS = 200
+
 @test_bp.route("/classify", methods=["POST"])
 def test_classification():
-    """Test endpoint for trying out the Gemini classification."""
+    """
+    Test endpoint for trying out the Gemini classification.
+    
+    Accepts either {"description": "..."} or {"descriptions": ["...", ...]}.
+    """
     try:
         data = request.get_json()
         
+        # A list of descriptions is classified in batch
+        if data and "descriptions" in data:
+            descriptions = data["descriptions"]
+            if not isinstance(descriptions, list) or not all(isinstance(d, str) for d in descriptions):
+                return jsonify({"error": "descriptions must be a list of strings"}), 400
+            if len(descriptions) > MAX_BATCH_DESCRIPTIONS:
+                return jsonify({"error": f"At most {MAX_BATCH_DESCRIPTIONS} descriptions per request"}), 400
+            
+            categories = classify_cases_batch(descriptions)
+            return jsonify({
+                "results": [
+                    {
+                        "original_description": description,
+                        "classified_category": category or "civil"
+                    }
+                    for description, category in zip(descriptions, categories)
+                ]
+            }), 200
+        
         if not data or "description" not in data:
             return jsonify({"error": "Missing description in request body"}), 400
             
@@ -26,3 +53,8 @@ def test_classification():
         
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+@test_bp.route("/classify/cache-stats", methods=["GET"])
+def classification_cache_stats():
+    """Hit/miss counters for the classification cache."""
+    return jsonify(classification_cache.stats()), 200
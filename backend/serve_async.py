@@ -0,0 +1,57 @@
+# serve_async.py
+"""
+Cooperative server for I/O-heavy traffic.
+
+The standard library is monkey-patched by gevent before anything else is
+imported, so every blocking socket call (pymongo, the Gemini REST client,
+SSE streams waiting on the event bus) yields to other requests instead of
+holding a thread. One process then keeps up to ASYNC_MAX_CONNECTIONS
+requests in flight, each a greenlet, while they wait on MongoDB or Gemini.
+The views stay ordinary Flask views: report, list, detail and classify
+need no async port, because their pymongo and Gemini calls already yield
+at the socket.
+
+This is used instead of Flask async views with an async Mongo driver.
+Flask runs each async view in a fresh event loop on the request's own
+thread, so a worker still serves one request per thread; gevent gives
+the same cooperative waiting to the existing synchronous code.
+
+CPU-bound work (the local classifier, PDF text extraction) still runs on
+the single hub, so run one process per core; bcrypt runs in the process
+pool of utils/passwords.py.
+
+Usage (from backend/):
+    python serve_async.py
+"""
+from gevent import monkey
+monkey.patch_all()
+
+import logging
+import os
+
+# gRPC does not cooperate with gevent's patched sockets
+os.environ.setdefault("GEMINI_TRANSPORT", "rest")
+
+from gevent.pool import Pool
+from gevent.pywsgi import WSGIServer
+from app import create_app
+
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "5000"))
+
+# Requests handled at once; further connections wait in the listen backlog
+MAX_CONNECTIONS = int(os.getenv("ASYNC_MAX_CONNECTIONS", "1000"))
+
+logger = logging.getLogger(__name__)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    app = create_app()
+    server = WSGIServer((HOST, PORT), app, spawn=Pool(MAX_CONNECTIONS))
+    logger.info("Serving on http://%s:%s with up to %s concurrent requests", HOST, PORT, MAX_CONNECTIONS)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# utils/auth.py
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from flask import g, jsonify, has_app_context
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from database.db import get_db
+
+# Token locations for the few routes opened by plain links or EventSource,
+# which cannot send an Authorization header: @jwt_required(locations=...)
+QUERY_TOKEN_LOCATIONS = ["headers", "query_string"]
+
+# Fields needed for authorization and display names
+USER_AUTH_PROJECTION = {"roles": 1, "firstName": 1, "lastName": 1, "email": 1}
+
+
+class UserCache:
+    """
+    Small process-level TTL cache of user documents (USER_AUTH_PROJECTION only).
+
+    Entries expire after `ttl` seconds so role and name changes made on other
+    workers are picked up quickly; changes made on this worker call
+    invalidate() directly.
+    """
+
+    def __init__(self, ttl=30.0, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # user_id -> (expires_at, user)
+        self._lock = threading.Lock()
+
+    def get(self, db, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                return entry[1]
+
+        user = db.users.find_one({"_id": ObjectId(user_id)}, USER_AUTH_PROJECTION)
+        if user is not None:
+            with self._lock:
+                self._entries[user_id] = (now + self.ttl, user)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return user
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+
+user_cache = UserCache()
+
+
+def invalidate_user(user_id):
+    """Drop a user from the cache after their profile or roles change."""
+    user_cache.invalidate(user_id)
+    if has_app_context() and g.get("current_user") is not None and str(g.current_user["_id"]) == str(user_id):
+        g.pop("current_user")
+
+
+def load_current_user():
+    """
+    Return the authenticated user's roles and name, or None if the user does not exist.
+
+    The result is memoized for the rest of the request and cached for a few
+    seconds across requests.
+    """
+    if "current_user" not in g:
+        try:
+            g.current_user = user_cache.get(get_db(), get_jwt_identity())
+        except (InvalidId, TypeError):
+            g.current_user = None
+    return g.current_user
+
+
+def role_required(*roles):
+    """
+    Require a valid access token for a user holding at least one of `roles`.
+
+    Usage:
+        @lawyer_bp.route("/dashboard", methods=["GET"])
+        @role_required("lawyer")
+        def lawyer_dashboard():
+            user = load_current_user()
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            verify_jwt_in_request()
+            user = load_current_user()
+            if not user or not any(role in user.get("roles", []) for role in roles):
+                return jsonify({"message": "Unauthorized"}), 403
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
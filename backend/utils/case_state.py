@@ -0,0 +1,243 @@
+# utils/case_state.py
+from datetime import datetime
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+from database.case_schema import DISPATCH_SORT
+from database.comments import add_case_comment
+from database.counters import record_case_assigned, record_status_change
+from utils.events import publish_case_event, CASE_ASSIGNED, STATUS_CHANGED, COMMENT_ADDED
+
+# Allowed case status changes: Pending -> Assigned -> InProgress/OnHold -> Closed
+STATUS_TRANSITIONS = {
+    "Pending": {"Assigned"},
+    "Assigned": {"InProgress", "OnHold", "Closed"},
+    "InProgress": {"OnHold", "Closed"},
+    "OnHold": {"InProgress", "Closed"},
+    "Closed": set()
+}
+
+# Statuses a lawyer may set through update_case_status
+LAWYER_STATUSES = {"InProgress", "OnHold", "Closed"}
+
+# Number of status changes kept on the case for auditing
+HISTORY_LIMIT = 50
+
+# Everything the routes return about a case
+CASE_PROJECTION = {"documentsText": 0}
+
+
+class CaseTransitionError(Exception):
+    """A case change that was refused; carries the HTTP status for the route."""
+
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+
+
+def _apply(db, query, set_fields, history_entry=None, comment_count=0, sort=None):
+    """
+    Apply one guarded update to a case and return the case after it, or None
+    if no case matched `query`. Status, updated_at, the audit entry and the
+    comment counter all change in this single write. With `sort`, the first
+    matching case in that order is updated.
+    """
+    update = {"$set": set_fields}
+    if history_entry:
+        update["$push"] = {"statusHistory": {"$each": [history_entry], "$slice": -HISTORY_LIMIT}}
+    if comment_count:
+        update["$inc"] = {"commentCount": comment_count}
+    return db.cases.find_one_and_update(
+        query,
+        update,
+        projection=CASE_PROJECTION,
+        sort=sort,
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def _case_id(case_id):
+    try:
+        return ObjectId(case_id)
+    except Exception:
+        raise CaseTransitionError("Invalid case ID", 400)
+
+
+def _history_entry(from_status, to_status, user_id, now):
+    return {"from": from_status, "to": to_status, "userId": user_id, "timestamp": now}
+
+
+def _assign(db, query, lawyer, sort=None):
+    """
+    Assign the (first) pending, unassigned case matching `query` to `lawyer`.
+
+    Returns:
+        tuple: (case after the update, comment bucket written), or (None, None)
+    """
+    now = datetime.utcnow()
+    lawyer_name = f"{lawyer.get('firstName', '')} {lawyer.get('lastName', '')}"
+
+    case = _apply(
+        db,
+        dict(query, status="Pending", assignedLawyer=None),
+        {"assignedLawyer": lawyer["_id"], "status": "Assigned", "updated_at": now, "assignedAt": now},
+        _history_entry("Pending", "Assigned", lawyer["_id"], now),
+        comment_count=1,
+        sort=sort
+    )
+    if case is None:
+        return None, None
+
+    record_case_assigned(db, case)
+    bucket = add_case_comment(db, case["_id"], {
+        "userId": lawyer["_id"],
+        "userType": "lawyer",
+        "text": f"Case accepted by {lawyer_name}",
+        "timestamp": now
+    })
+    # Lawyers drop the case from their available list
+    publish_case_event(CASE_ASSIGNED, case, broadcastRoles=["lawyer"])
+    return case, bucket
+
+
+def accept_case(db, case_id, lawyer):
+    """
+    Assign a pending, unassigned case to `lawyer`.
+
+    Returns:
+        tuple: (case after the update, comment bucket written)
+
+    Raises:
+        CaseTransitionError: If the case is missing or no longer available
+    """
+    case_oid = _case_id(case_id)
+    case, bucket = _assign(db, {"_id": case_oid}, lawyer)
+    if case is None:
+        current = db.cases.find_one({"_id": case_oid}, {"_id": 1})
+        if not current:
+            raise CaseTransitionError("Case not found", 404)
+        raise CaseTransitionError("Case could not be assigned. It may have been assigned to another lawyer.", 400)
+    return case, bucket
+
+
+def claim_next_case(db, lawyer, category=None):
+    """
+    Assign the most urgent, longest waiting pending case (DISPATCH_SORT) to
+    `lawyer` in a single find_one_and_update, so concurrent claims never
+    receive the same case.
+
+    Returns:
+        tuple: (case after the update, comment bucket written)
+
+    Raises:
+        CaseTransitionError: If no pending case is available
+    """
+    query = {"category": category} if category else {}
+    case, bucket = _assign(db, query, lawyer, sort=DISPATCH_SORT)
+    if case is None:
+        raise CaseTransitionError("No cases available", 404)
+    return case, bucket
+
+
+def change_status(db, case_id, lawyer_id, new_status, comment_text=""):
+    """
+    Move a case assigned to `lawyer_id` to `new_status`, guarded by the
+    statuses it may be reached from, optionally with a comment.
+
+    Returns:
+        tuple: (case after the update, comment bucket written or None)
+
+    Raises:
+        CaseTransitionError: If the status is invalid, the case is missing or
+            not assigned to the lawyer, or the transition is not allowed
+    """
+    if new_status not in LAWYER_STATUSES:
+        raise CaseTransitionError("Invalid status", 400)
+
+    case_oid = _case_id(case_id)
+    lawyer_oid = ObjectId(lawyer_id)
+    from_statuses = [status for status, targets in STATUS_TRANSITIONS.items() if new_status in targets]
+    now = datetime.utcnow()
+
+    # Several prior statuses are allowed, so the audit entry takes "from" out
+    # of the document itself with an update pipeline
+    case = db.cases.find_one_and_update(
+        {"_id": case_oid, "assignedLawyer": lawyer_oid, "status": {"$in": from_statuses}},
+        [
+            {"$set": {
+                "status": new_status,
+                "updated_at": now,
+                "commentCount": {"$add": [{"$ifNull": ["$commentCount", 0]}, 1 if comment_text else 0]},
+                "statusHistory": {"$slice": [
+                    {"$concatArrays": [
+                        {"$ifNull": ["$statusHistory", []]},
+                        [{"from": "$status", "to": new_status, "userId": lawyer_oid, "timestamp": now}]
+                    ]},
+                    -HISTORY_LIMIT
+                ]}
+            }}
+        ],
+        projection=CASE_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    if case is None:
+        current = db.cases.find_one({"_id": case_oid}, {"assignedLawyer": 1, "status": 1})
+        if not current:
+            raise CaseTransitionError("Case not found", 404)
+        if current.get("assignedLawyer") != lawyer_oid:
+            raise CaseTransitionError("You are not assigned to this case", 403)
+        raise CaseTransitionError(f"Case cannot move from {current.get('status')} to {new_status}", 400)
+
+    from_status = case["statusHistory"][-1]["from"]
+    record_status_change(db, case, from_status)
+    bucket = None
+    if comment_text:
+        bucket = add_case_comment(db, case_oid, {
+            "userId": lawyer_oid,
+            "userType": "lawyer",
+            "text": comment_text,
+            "timestamp": now
+        })
+    publish_case_event(STATUS_CHANGED, case, previousStatus=from_status, comment=comment_text or None)
+    return case, bucket
+
+
+def add_comment(db, case_id, user, comment_text):
+    """
+    Add a comment to a case the user may see: any case for admins, their own
+    cases for clients, assigned cases for lawyers.
+
+    Returns:
+        tuple: (case after the update, comment bucket written)
+
+    Raises:
+        CaseTransitionError: If the case is missing or the user has no access
+    """
+    case_oid = _case_id(case_id)
+    user_roles = user.get("roles", [])
+    now = datetime.utcnow()
+
+    query = {"_id": case_oid}
+    if "admin" not in user_roles:
+        access = []
+        if "client" in user_roles:
+            access.append({"clientId": user["_id"]})
+        if "lawyer" in user_roles:
+            access.append({"assignedLawyer": user["_id"]})
+        query["$or"] = access or [{"_id": None}]
+
+    case = _apply(db, query, {"updated_at": now}, comment_count=1)
+    if case is None:
+        if not db.cases.find_one({"_id": case_oid}, {"_id": 1}):
+            raise CaseTransitionError("Case not found", 404)
+        raise CaseTransitionError("You are not authorized to comment on this case", 403)
+
+    comment = {
+        "userId": user["_id"],
+        "userType": user_roles[0] if user_roles else "client",  # Use the first role as the user type
+        "text": comment_text,
+        "timestamp": now
+    }
+    bucket = add_case_comment(db, case_oid, comment)
+    publish_case_event(COMMENT_ADDED, case, comment=comment)
+    return case, bucket
@@ -0,0 +1,110 @@
+# utils/classification_cache.py
+import logging
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from database.db import get_db
+
+logger = logging.getLogger(__name__)
+
+# Cache settings, overridable from the environment
+MEMORY_CACHE_SIZE = int(os.getenv("CLASSIFICATION_CACHE_SIZE", "10000"))
+CACHE_TTL_DAYS = int(os.getenv("CLASSIFICATION_CACHE_TTL_DAYS", "30"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_description(description):
+    """Case-fold and collapse whitespace so trivial edits share a cache entry."""
+    return _WHITESPACE.sub(" ", (description or "")).strip().lower()
+
+
+def cache_key(description, model_name, prompt_version):
+    raw = f"{model_name}\n{prompt_version}\n{normalize_description(description)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class ClassificationCache:
+    """
+    Two-tier cache of classification results: an in-process LRU in front of
+    the classification_cache collection, whose documents expire through a
+    TTL index on created_at.
+    """
+
+    def __init__(self, max_size=MEMORY_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "db_hits": 0, "misses": 0, "stores": 0, "errors": 0}
+
+    def get(self, key):
+        """Return the cached category for `key`, or None."""
+        with self._lock:
+            category = self._entries.get(key)
+            if category is not None:
+                self._entries.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return category
+
+        try:
+            doc = get_db().classification_cache.find_one({"_id": key}, {"category": 1})
+        except Exception:
+            logger.exception("Error reading classification cache")
+            self._count("errors")
+            doc = None
+
+        if doc is None:
+            self._count("misses")
+            return None
+
+        self._count("db_hits")
+        self._remember(key, doc["category"])
+        return doc["category"]
+
+    def set(self, key, category, model_name, prompt_version):
+        self._remember(key, category)
+        self._count("stores")
+        try:
+            get_db().classification_cache.update_one(
+                {"_id": key},
+                {"$set": {
+                    "category": category,
+                    "model": model_name,
+                    "promptVersion": prompt_version,
+                    "created_at": datetime.utcnow()
+                }},
+                upsert=True
+            )
+        except Exception:
+            logger.exception("Error writing classification cache")
+            self._count("errors")
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._entries)
+        lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["memory_hits"] + stats["db_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Empty the in-process tier (the Mongo tier expires on its own)."""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key, category):
+        with self._lock:
+            self._entries[key] = category
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+
+classification_cache = ClassificationCache()
@@ -0,0 +1,231 @@
+# utils/classification_jobs.py
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from database.db import get_db
+from database.counters import record_category_change
+from utils.gemini_classifier import classify_case_with_source, PROMPT_VERSION
+
+logger = logging.getLogger(__name__)
+
+# Job settings, overridable from the environment
+LEASE_SECONDS = int(os.getenv("CLASSIFICATION_LEASE_SECONDS", "120"))
+MAX_ATTEMPTS = int(os.getenv("CLASSIFICATION_MAX_ATTEMPTS", "5"))
+RETRY_DELAY_SECONDS = int(os.getenv("CLASSIFICATION_RETRY_DELAY_SECONDS", "30"))
+POLL_SECONDS = float(os.getenv("CLASSIFICATION_POLL_SECONDS", "2"))
+
+# Category used when every attempt fails, matching classify_case_sync's fallback
+FALLBACK_CATEGORY = "civil"
+
+# Case fields read back to move the case between dashboard categories
+COUNTER_PROJECTION = {"category": 1, "clientId": 1, "assignedLawyer": 1}
+
+
+def classification_update(category, source, now=None):
+    """
+    The case update recording an AI classification. The prompt version only
+    applies to Gemini answers, so local ones drop it.
+    """
+    update = {"$set": {
+        "category": category,
+        "aiClassified": True,
+        "classificationStatus": "done",
+        "classificationSource": source
+    }}
+    if now is not None:
+        update["$set"]["updated_at"] = now
+    if source == "gemini":
+        update["$set"]["classificationPromptVersion"] = PROMPT_VERSION
+    else:
+        update["$unset"] = {"classificationPromptVersion": ""}
+    return update
+
+
+def enqueue_classification(db, case_id, description):
+    """Queue a case for background classification."""
+    now = datetime.utcnow()
+    db.classification_jobs.insert_one({
+        "caseId": case_id,
+        "description": description,
+        "status": "queued",
+        "attempts": 0,
+        "availableAt": now,
+        "leaseExpiresAt": None,
+        "created_at": now,
+        "updated_at": now
+    })
+
+
+def claim_job(db, worker_id):
+    """
+    Lease the oldest runnable job: one that is queued and due, or whose
+    previous lease has expired because its worker died.
+
+    Returns:
+        dict: The leased job, or None if there is nothing to do
+    """
+    now = datetime.utcnow()
+    return db.classification_jobs.find_one_and_update(
+        {
+            "$or": [
+                {"status": "queued", "availableAt": {"$lte": now}},
+                {"status": "running", "leaseExpiresAt": {"$lte": now}}
+            ]
+        },
+        {
+            "$set": {
+                "status": "running",
+                "workerId": worker_id,
+                "leaseExpiresAt": now + timedelta(seconds=LEASE_SECONDS),
+                "updated_at": now
+            },
+            "$inc": {"attempts": 1}
+        },
+        sort=[("availableAt", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+def _hold_lease(db, job, now):
+    """
+    Renew `job`'s lease if this worker still holds it. A worker whose lease
+    ran out (a slow Gemini call) has lost the job to another worker and must
+    not write to the case.
+
+    Returns:
+        bool: Whether the lease is still held
+    """
+    result = db.classification_jobs.update_one(
+        {
+            "_id": job["_id"],
+            "workerId": job["workerId"],
+            "status": "running",
+            "leaseExpiresAt": {"$gt": now}
+        },
+        {"$set": {"leaseExpiresAt": now + timedelta(seconds=LEASE_SECONDS), "updated_at": now}}
+    )
+    if result.matched_count:
+        return True
+    logger.warning("Lease on classification job %s expired; dropping its result", job["_id"])
+    return False
+
+
+def process_job(db, job):
+    """Classify one leased job and write the result to its case."""
+    try:
+        category, source = classify_case_with_source(job["description"])
+    except Exception as e:
+        logger.exception("Error classifying case %s (attempt %s)", job["caseId"], job["attempts"])
+        _fail_job(db, job, str(e))
+        return
+
+    now = datetime.utcnow()
+    if not _hold_lease(db, job, now):
+        return
+    previous = db.cases.find_one_and_update(
+        {"_id": job["caseId"]},
+        classification_update(category, source, now),
+        projection=COUNTER_PROJECTION
+    )
+    if previous:
+        record_category_change(db, previous, previous.get("category"), category)
+    db.classification_jobs.update_one(
+        {"_id": job["_id"], "workerId": job["workerId"]},
+        {"$set": {"status": "done", "leaseExpiresAt": None, "updated_at": now}}
+    )
+
+
+def _fail_job(db, job, error):
+    now = datetime.utcnow()
+    if job["attempts"] < MAX_ATTEMPTS:
+        # Back off linearly before the next attempt
+        db.classification_jobs.update_one(
+            {"_id": job["_id"], "workerId": job["workerId"]},
+            {"$set": {
+                "status": "queued",
+                "availableAt": now + timedelta(seconds=RETRY_DELAY_SECONDS * job["attempts"]),
+                "leaseExpiresAt": None,
+                "lastError": error,
+                "updated_at": now
+            }}
+        )
+        return
+
+    if not _hold_lease(db, job, now):
+        return
+    previous = db.cases.find_one_and_update(
+        {"_id": job["caseId"]},
+        {"$set": {
+            "category": FALLBACK_CATEGORY,
+            "aiClassified": True,
+            "classificationStatus": "failed",
+            "updated_at": now
+        }},
+        projection=COUNTER_PROJECTION
+    )
+    if previous:
+        record_category_change(db, previous, previous.get("category"), FALLBACK_CATEGORY)
+    db.classification_jobs.update_one(
+        {"_id": job["_id"], "workerId": job["workerId"]},
+        {"$set": {"status": "failed", "leaseExpiresAt": None, "lastError": error, "updated_at": now}}
+    )
+
+
+class ClassificationWorkerPool:
+    """Background threads that drain the classification_jobs collection."""
+
+    def __init__(self, size):
+        self.size = size
+        self._threads = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker threads if they are not already running."""
+        with self._lock:
+            if self._threads or self.size <= 0:
+                return
+            self._stop.clear()
+            for _ in range(self.size):
+                thread = threading.Thread(target=self._run, name="classification-worker", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        with self._lock:
+            for thread in self._threads:
+                thread.join()
+            self._threads = []
+
+    def _after_fork(self):
+        # Threads do not survive fork; the child starts its own on demand
+        self._threads = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def _run(self):
+        worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        while not self._stop.is_set():
+            try:
+                db = get_db()
+                job = claim_job(db, worker_id)
+                if job is None:
+                    self._stop.wait(POLL_SECONDS)
+                    continue
+                process_job(db, job)
+            except Exception:
+                logger.exception("Classification worker error")
+                self._stop.wait(POLL_SECONDS)
+
+
+# In-process pool, started on the first enqueue. Set CLASSIFIER_WORKERS=0 to
+# leave the queue to dedicated `flask classification-worker` processes.
+worker_pool = ClassificationWorkerPool(int(os.getenv("CLASSIFIER_WORKERS", "2")))
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=worker_pool._after_fork)
@@ -0,0 +1,69 @@
+# utils/compression.py
+import gzip
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Response types worth compressing
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/plain", "text/csv"}
+
+# Fast settings: responses are compressed on every request, not cached
+GZIP_LEVEL = 5
+BROTLI_QUALITY = 4
+
+
+def _encodings():
+    return ["br", "gzip"] if brotli is not None else ["gzip"]
+
+
+def compress_response(response, min_size):
+    """
+    Compress a response body with brotli or gzip, whichever the client
+    prefers, when it is at least `min_size` bytes.
+
+    Streamed, file and already encoded responses are left alone.
+    """
+    if (
+        response.status_code < 200 or response.status_code >= 300
+        or response.direct_passthrough
+        or response.is_streamed
+        or "Content-Encoding" in response.headers
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+    ):
+        return response
+
+    # The body depends on Accept-Encoding even when it is sent uncompressed
+    response.vary.add("Accept-Encoding")
+
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+
+    encoding = request.accept_encodings.best_match(_encodings())
+    if encoding == "br":
+        data = brotli.compress(data, quality=BROTLI_QUALITY)
+    elif encoding == "gzip":
+        data = gzip.compress(data, compresslevel=GZIP_LEVEL)
+    else:
+        return response
+
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+
+    # A strong ETag names the uncompressed bytes
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_compression(app):
+    """Compress JSON responses above COMPRESSION_MIN_BYTES."""
+    min_size = app.config.get("COMPRESSION_MIN_BYTES", 1024)
+
+    @app.after_request
+    def compress(response):
+        return compress_response(response, min_size)
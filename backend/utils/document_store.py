@@ -0,0 +1,102 @@
+# utils/document_store.py
+import hashlib
+import os
+import tempfile
+from datetime import datetime
+from pymongo import ReturnDocument
+
+# Uploaded files are stored once per distinct content under
+# uploads/objects/<first two hex digits>/<sha256>
+UPLOADS_DIR = "uploads"
+OBJECTS_DIR = os.path.join(UPLOADS_DIR, "objects")
+TMP_DIR = os.path.join(UPLOADS_DIR, "tmp")
+CHUNK_SIZE = 1024 * 1024
+
+
+def object_path(sha256):
+    return os.path.join(OBJECTS_DIR, sha256[:2], sha256)
+
+
+def store_upload(db, file):
+    """
+    Store an uploaded file by content and take a reference on it.
+
+    The upload is read once, hashed while it is copied to a temporary file.
+    The reference is taken before the file is put in place, so a concurrent
+    release_document of the same content cannot delete the object between
+    the two steps. A new blob row always moves its copy into place; an
+    existing one only if the file is missing.
+
+    Args:
+        db: The MongoDB database handle
+        file (FileStorage): The uploaded file
+
+    Returns:
+        dict: sha256, size, contentType and path of the stored object
+    """
+    digest, size, tmp_path = _hash_to_temp(file.stream)
+    path = object_path(digest)
+    content_type = file.mimetype or "application/octet-stream"
+    try:
+        result = db.document_blobs.update_one(
+            {"_id": digest},
+            {
+                "$inc": {"refs": 1},
+                "$setOnInsert": {
+                    "size": size,
+                    "path": path,
+                    "contentType": content_type,
+                    "created_at": datetime.utcnow()
+                }
+            },
+            upsert=True
+        )
+    except Exception:
+        os.remove(tmp_path)
+        raise
+
+    try:
+        if result.upserted_id is not None or not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+        else:
+            os.remove(tmp_path)
+    except Exception:
+        release_document(db, digest)
+        raise
+    return {"sha256": digest, "size": size, "contentType": content_type, "path": path}
+
+
+def release_document(db, sha256):
+    """Drop one reference to a stored object, deleting it when none remain."""
+    blob = db.document_blobs.find_one_and_update(
+        {"_id": sha256},
+        {"$inc": {"refs": -1}},
+        return_document=ReturnDocument.AFTER
+    )
+    if blob and blob["refs"] <= 0:
+        result = db.document_blobs.delete_one({"_id": sha256, "refs": {"$lte": 0}})
+        # Leave the file if an upload of the same content has taken a new
+        # reference since; it may already be relying on the file
+        if result.deleted_count and db.document_blobs.find_one({"_id": sha256}, {"_id": 1}) is None:
+            try:
+                os.remove(blob["path"])
+            except FileNotFoundError:
+                pass
+
+
+def _hash_to_temp(stream):
+    os.makedirs(TMP_DIR, exist_ok=True)
+    sha = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(dir=TMP_DIR, delete=False) as tmp:
+        try:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                sha.update(chunk)
+                size += len(chunk)
+                tmp.write(chunk)
+        except Exception:
+            tmp.close()
+            os.remove(tmp.name)
+            raise
+    return sha.hexdigest(), size, tmp.name
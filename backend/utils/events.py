@@ -0,0 +1,230 @@
+# utils/events.py
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from pymongo import CursorType
+from pymongo.errors import CollectionInvalid
+from database.db import get_db
+
+logger = logging.getLogger(__name__)
+
+# Event types pushed to clients
+CASE_CREATED = "case-created"
+CASE_ASSIGNED = "case-assigned"
+STATUS_CHANGED = "status-changed"
+COMMENT_ADDED = "comment-added"
+
+# Events buffered per subscriber; a subscriber that falls further behind is
+# disconnected and reconnects (EventSource does so by itself)
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# Capped collection used by the "mongo" bus
+EVENTS_COLLECTION = "case_events"
+EVENTS_COLLECTION_BYTES = int(os.getenv("EVENTS_COLLECTION_BYTES", str(16 * 1024 * 1024)))
+
+
+class Subscription:
+    """One subscriber's queue of events."""
+
+    def __init__(self, bus):
+        self._bus = bus
+        self._queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+    def get(self, timeout):
+        """Next event, or None if none arrived within `timeout` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def _offer(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.overflowed = True
+
+    def close(self):
+        self._bus.unsubscribe(self)
+
+
+class InProcessEventBus:
+    """
+    Publish/subscribe within one process. Enough for a single worker;
+    with several workers each only sees the events published by itself.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscription = Subscription(self)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event):
+        self._dispatch(event)
+
+    def _after_fork(self):
+        # Subscribers and threads belong to the parent process
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def _dispatch(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription._offer(event)
+
+
+class MongoEventBus(InProcessEventBus):
+    """
+    Publish/subscribe across workers through a capped collection.
+
+    Events are inserted into EVENTS_COLLECTION; one thread per process
+    follows it with a tailable cursor and hands new events to the local
+    subscribers. The thread starts with the first subscription, so workers
+    that never serve a stream do not hold a cursor open.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._tail_thread = None
+        self._collection_ready = False
+
+    def subscribe(self):
+        subscription = super().subscribe()
+        self._start_tailing()
+        return subscription
+
+    def _after_fork(self):
+        super()._after_fork()
+        self._tail_thread = None
+
+    def publish(self, event):
+        # The tailing thread delivers it locally as well
+        self._collection().insert_one(dict(event))
+
+    def _collection(self):
+        db = get_db()
+        if not self._collection_ready:
+            try:
+                db.create_collection(EVENTS_COLLECTION, capped=True, size=EVENTS_COLLECTION_BYTES)
+            except CollectionInvalid:
+                pass  # Already created by another worker
+            self._collection_ready = True
+        return db[EVENTS_COLLECTION]
+
+    def _start_tailing(self):
+        with self._lock:
+            if self._tail_thread is None:
+                self._tail_thread = threading.Thread(target=self._tail, name="case-events-tail", daemon=True)
+                self._tail_thread.start()
+
+    def _tail(self):
+        collection = self._collection()
+        # Start after the newest event. ObjectIds are generated by the
+        # publishers, so they do not follow insertion order; the cursor is
+        # resumed by $natural (insertion) order instead.
+        latest = collection.find_one({}, {"_id": 1}, sort=[("$natural", -1)])
+        last_id = latest["_id"] if latest else None
+        while True:
+            try:
+                cursor = collection.find({}, cursor_type=CursorType.TAILABLE_AWAIT)
+                last_id = self._follow(cursor, last_id)
+            except Exception:
+                logger.exception("Error following %s", EVENTS_COLLECTION)
+            # A tailable cursor on an empty collection dies at once
+            time.sleep(1)
+
+    def _follow(self, cursor, last_id):
+        """
+        Dispatch the events `cursor` returns after `last_id`; returns the
+        last event dispatched.
+
+        The cursor starts at the oldest event, so everything up to and
+        including `last_id` is skipped. Skipped events are held back until
+        `last_id` turns up: if the cursor catches up without it, it was
+        overwritten in the capped collection and every held event is new.
+        """
+        held = [] if last_id is not None else None
+        while cursor.alive:
+            for event in cursor:
+                if held is None:
+                    last_id = event["_id"]
+                    self._dispatch(event)
+                elif event["_id"] == last_id:
+                    held = None
+                else:
+                    held.append(event)
+            if held:
+                for event in held:
+                    last_id = event["_id"]
+                    self._dispatch(event)
+            held = None
+        return last_id
+
+
+def _create_bus():
+    # With several workers a memory bus only reaches the streams connected
+    # to the publishing worker, so default to mongo there
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    kind = os.getenv("EVENT_BUS", "mongo" if workers > 1 else "memory").lower()
+    if kind == "mongo":
+        return MongoEventBus()
+    if workers > 1:
+        logger.warning("EVENT_BUS=memory with %s workers: streams miss events published by other workers", workers)
+    return InProcessEventBus()
+
+
+# EVENT_BUS=memory (one worker) or mongo (several workers); defaults to
+# mongo when WEB_CONCURRENCY is above 1
+event_bus = _create_bus()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=event_bus._after_fork)
+
+
+def case_event(event_type, case, **extra):
+    """
+    Build an event for `case`. clientId and lawyerId decide who receives it;
+    `broadcast_roles` additionally sends it to every user with those roles.
+    """
+    event = {
+        "type": event_type,
+        "caseId": case["_id"],
+        "title": case.get("title", ""),
+        "status": case.get("status"),
+        "category": case.get("category"),
+        "urgencyLevel": case.get("urgencyLevel"),
+        "clientId": case.get("clientId"),
+        "lawyerId": case.get("assignedLawyer"),
+        "broadcastRoles": [],
+        "timestamp": case.get("updated_at") or datetime.utcnow()
+    }
+    event.update(extra)
+    return event
+
+
+def publish_case_event(event_type, case, **extra):
+    """Publish a case event. Failures are logged; the write has already happened."""
+    try:
+        event_bus.publish(case_event(event_type, case, **extra))
+    except Exception:
+        logger.exception("Error publishing %s event", event_type)
+
+
+def visible_to(event, user_id, roles):
+    """Whether the user with `user_id` (ObjectId) and `roles` should receive `event`."""
+    if user_id in (event.get("clientId"), event.get("lawyerId")):
+        return True
+    return any(role in roles for role in event.get("broadcastRoles", []))
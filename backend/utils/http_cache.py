@@ -0,0 +1,57 @@
+# utils/http_cache.py
+import hashlib
+from flask import request, make_response
+
+# One {_id: collection name, version} document per collection, bumped by
+# bulk writes that change listed fields without touching updated_at
+LIST_VERSIONS_COLLECTION = "list_versions"
+
+
+def list_etag(collection, query):
+    """
+    Validator for a list endpoint: the newest updated_at among the documents
+    matching `query`, how many there are and the collection's list version,
+    mixed with the request path so each page and page size gets its own tag.
+
+    The first two are read from an index on the query fields and
+    updated_at, so no case documents are loaded or serialized.
+    """
+    latest = collection.find_one(query, {"updated_at": 1, "_id": 0}, sort=[("updated_at", -1)])
+    count = collection.count_documents(query)
+    updated_at = latest.get("updated_at") if latest else None
+    version = collection.database[LIST_VERSIONS_COLLECTION].find_one({"_id": collection.name})
+    raw = f"{request.full_path}|{updated_at}|{count}|{version['version'] if version else 0}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def bump_list_version(collection):
+    """
+    Change every list ETag over `collection`. For bulk writes, such as the
+    classification backfill, that change listed fields but leave updated_at
+    alone so lists keep their order.
+    """
+    collection.database[LIST_VERSIONS_COLLECTION].update_one(
+        {"_id": collection.name}, {"$inc": {"version": 1}}, upsert=True
+    )
+
+
+def _revalidate(response):
+    # Browsers may keep the list but must check it on every poll
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
+
+def not_modified(etag):
+    """Return a 304 response if the client already has `etag`, else None."""
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    response = make_response("", 304)
+    response.set_etag(etag, weak=True)
+    return _revalidate(response)
+
+
+def with_etag(response, etag):
+    """Tag a list response with the validator from list_etag."""
+    response.set_etag(etag, weak=True)
+    return _revalidate(response)
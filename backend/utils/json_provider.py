@@ -0,0 +1,70 @@
+# utils/json_provider.py
+from datetime import date, datetime
+from bson.objectid import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the standard json module is used instead
+    orjson = None
+
+
+def _default(o):
+    """
+    Encode the types MongoDB documents contain, the way serialize_doc did:
+    ObjectId as its hex string and datetimes in ISO 8601.
+    """
+    if isinstance(o, ObjectId):
+        return str(o)
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    try:
+        return DefaultJSONProvider.default(o)
+    except TypeError:
+        # serialize_doc fell back to str() for anything else
+        return str(o)
+
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes documents straight from pymongo in one pass,
+    so routes no longer need to copy them through serialize_doc first.
+
+    When orjson is installed it does the encoding; objects it cannot handle
+    (such as integers wider than 64 bits) fall back to the json module.
+    """
+
+    default = staticmethod(_default)
+
+    def _orjson_options(self, indent=None):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        # orjson has no equivalent for other json.dumps arguments
+        if orjson is not None and set(kwargs) <= {"indent", "separators"}:
+            try:
+                return orjson.dumps(obj, default=_default, option=self._orjson_options(kwargs.get("indent"))).decode("utf-8")
+            except orjson.JSONEncodeError:
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = orjson.dumps(
+                obj,
+                default=_default,
+                option=self._orjson_options(indent=pretty) | orjson.OPT_APPEND_NEWLINE
+            )
+        except orjson.JSONEncodeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body, mimetype=self.mimetype)
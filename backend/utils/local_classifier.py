@@ -0,0 +1,199 @@
+# utils/local_classifier.py
+import logging
+import os
+import re
+import threading
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Where the trained model is stored, and the probability needed to skip Gemini
+MODEL_PATH = os.getenv(
+    "LOCAL_CLASSIFIER_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models", "local_classifier.npz")
+)
+CONFIDENCE_THRESHOLD = float(os.getenv("LOCAL_CLASSIFIER_THRESHOLD", "0.9"))
+
+_TOKEN = re.compile(r"[a-z][a-z'-]+")
+_STOPWORDS = frozenset("""
+a an and are as at be been but by for from had has have he her his i in is it its
+me my of on or our she that the their them they this to was we were which who will
+with would you your not no so if into about after before than then there when
+""".split())
+
+
+def tokenize(text):
+    """Lower-cased word unigrams and bigrams, without stopwords."""
+    words = [w for w in _TOKEN.findall((text or "").lower()) if w not in _STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class LocalClassifier:
+    """
+    TF-IDF weighted multinomial naive Bayes over CASE_CATEGORIES.
+
+    Training accumulates per-class TF-IDF mass directly, so no document-term
+    matrix is ever materialized; prediction is a gather plus one small
+    matrix-vector product.
+    """
+
+    def __init__(self, classes, vocabulary, idf, feature_log_prob, class_log_prior):
+        self.classes = list(classes)
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.feature_log_prob = feature_log_prob
+        self.class_log_prior = class_log_prior
+
+    @classmethod
+    def train(cls, texts, labels, max_features=50000, min_df=2, alpha=0.1):
+        """
+        Fit a model on labelled descriptions.
+
+        Args:
+            texts (list): Case descriptions
+            labels (list): The category of each description
+            max_features (int): Keep only the most frequent terms
+            min_df (int): Ignore terms seen in fewer documents
+            alpha (float): Additive smoothing
+        """
+        classes = sorted(set(labels))
+        class_index = {c: i for i, c in enumerate(classes)}
+        docs = [tokenize(text) for text in texts]
+
+        # Document frequencies decide the vocabulary and the IDF weights
+        df = {}
+        for tokens in docs:
+            for token in set(tokens):
+                df[token] = df.get(token, 0) + 1
+        terms = [t for t, n in df.items() if n >= min_df] or list(df)
+        terms.sort(key=lambda t: -df[t])
+        terms = terms[:max_features]
+        vocabulary = {t: i for i, t in enumerate(terms)}
+        doc_freq = np.array([df[t] for t in terms], dtype=np.float64)
+        idf = np.log((1 + len(docs)) / (1 + doc_freq)) + 1
+
+        class_mass = np.zeros((len(classes), len(terms)))
+        class_counts = np.zeros(len(classes))
+        for tokens, label in zip(docs, labels):
+            row = class_index[label]
+            class_counts[row] += 1
+            indices, weights = _tfidf(tokens, vocabulary, idf)
+            class_mass[row, indices] += weights
+
+        smoothed = class_mass + alpha
+        feature_log_prob = np.log(smoothed / smoothed.sum(axis=1, keepdims=True))
+        class_log_prior = np.log(class_counts / class_counts.sum())
+        return cls(classes, vocabulary, idf, feature_log_prob, class_log_prior)
+
+    def predict_proba(self, text):
+        """Return the class probabilities for one description, aligned with self.classes."""
+        return self._proba(*_tfidf(tokenize(text), self.vocabulary, self.idf))
+
+    def predict(self, text):
+        """
+        Returns:
+            tuple: (category, probability), or (None, 0.0) if no known term appears
+        """
+        indices, weights = _tfidf(tokenize(text), self.vocabulary, self.idf)
+        if len(indices) == 0:
+            return None, 0.0
+        proba = self._proba(indices, weights)
+        best = int(proba.argmax())
+        return self.classes[best], float(proba[best])
+
+    def _proba(self, indices, weights):
+        scores = self.class_log_prior + self.feature_log_prob[:, indices] @ weights
+        scores = np.exp(scores - scores.max())
+        return scores / scores.sum()
+
+    def save(self, path=MODEL_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        terms = sorted(self.vocabulary, key=self.vocabulary.get)
+        np.savez_compressed(
+            path,
+            classes=np.array(self.classes),
+            terms=np.array(terms),
+            idf=self.idf,
+            feature_log_prob=self.feature_log_prob,
+            class_log_prior=self.class_log_prior
+        )
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        with np.load(path) as data:
+            terms = data["terms"].tolist()
+            return cls(
+                data["classes"].tolist(),
+                {t: i for i, t in enumerate(terms)},
+                data["idf"],
+                data["feature_log_prob"],
+                data["class_log_prior"]
+            )
+
+
+def _tfidf(tokens, vocabulary, idf):
+    """Sparse L2-normalized TF-IDF vector of a token list, as (indices, weights)."""
+    indices = [vocabulary[t] for t in tokens if t in vocabulary]
+    if not indices:
+        return np.array([], dtype=np.int64), np.array([])
+    indices, counts = np.unique(np.array(indices, dtype=np.int64), return_counts=True)
+    weights = counts * idf[indices]
+    return indices, weights / np.linalg.norm(weights)
+
+
+def load_training_data(db, categories):
+    """
+    Labelled descriptions from db.cases: every case with a known category,
+    except those that fell back to a default after classification failed
+    and those this model labelled itself, which would only reinforce its
+    own guesses.
+
+    Returns:
+        tuple: (texts, labels)
+    """
+    cursor = db.cases.find(
+        {
+            "category": {"$in": list(categories)},
+            "classificationStatus": {"$ne": "failed"},
+            "classificationSource": {"$ne": "local"}
+        },
+        {"description": 1, "category": 1}
+    )
+    texts, labels = [], []
+    for case in cursor:
+        if case.get("description"):
+            texts.append(case["description"])
+            labels.append(case["category"])
+    return texts, labels
+
+
+_model = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def get_local_classifier():
+    """Load the trained model on first use. Returns None if none has been trained."""
+    global _model, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                if os.path.exists(MODEL_PATH):
+                    try:
+                        _model = LocalClassifier.load(MODEL_PATH)
+                    except Exception:
+                        logger.exception("Error loading local classifier")
+                _model_loaded = True
+    return _model
+
+
+def classify_locally(description, threshold=CONFIDENCE_THRESHOLD):
+    """
+    Returns:
+        str: The local model's category if it is at least `threshold` confident, else None
+    """
+    model = get_local_classifier()
+    if model is None:
+        return None
+    category, probability = model.predict(description)
+    return category if probability >= threshold else None
@@ -0,0 +1,195 @@
+# utils/metrics.py
+import logging
+import os
+import time
+from contextvars import ContextVar
+from flask import Response, request, abort
+from pymongo import monitoring
+from prometheus_client import (
+    CollectorRegistry, Counter, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest
+)
+from prometheus_client import multiprocess
+
+logger = logging.getLogger(__name__)
+
+# MongoDB commands one request may run before it is logged as a likely
+# N+1 query pattern
+QUERY_BUDGET = int(os.getenv("MONGO_QUERY_BUDGET", "10"))
+
+# When set, GET /metrics requires "Authorization: Bearer <METRICS_TOKEN>"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Under gunicorn, point PROMETHEUS_MULTIPROC_DIR at an empty directory so
+# /metrics reports every worker rather than the one that answered
+MULTIPROCESS_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "Time to produce a response, by route",
+    ["method", "route"]
+)
+REQUESTS = Counter(
+    "http_requests_total", "Responses by route and status code",
+    ["method", "route", "status"]
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "Response body size after compression, by route",
+    ["route"], buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+)
+MONGO_COMMANDS = Counter(
+    "mongo_commands_total", "MongoDB commands by name and outcome",
+    ["command", "outcome"]
+)
+MONGO_COMMAND_LATENCY = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command round trip, by name",
+    ["command"], buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+)
+REQUEST_MONGO_COMMANDS = Histogram(
+    "http_request_mongo_commands", "MongoDB commands run per request, by route",
+    ["route"], buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+)
+REQUEST_MONGO_TIME = Histogram(
+    "http_request_mongo_seconds", "Time per request spent waiting on MongoDB, by route",
+    ["route"]
+)
+QUERY_BUDGET_EXCEEDED = Counter(
+    "http_request_query_budget_exceeded_total", "Requests that ran more than MONGO_QUERY_BUDGET commands",
+    ["route"]
+)
+CLASSIFIER_CALLS = Counter(
+    "classifier_calls_total", "Classification lookups by tier (local, cache, gemini, gemini_batch) and outcome",
+    ["tier", "outcome"]
+)
+CLASSIFIER_LATENCY = Histogram(
+    "classifier_latency_seconds", "Classification call latency, by tier",
+    ["tier"], buckets=(0.001, 0.005, 0.025, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+LOG_MESSAGES = Counter(
+    "log_messages_total", "Warnings and errors logged, by level and logger",
+    ["level", "logger"]
+)
+
+
+class RequestQueries:
+    """MongoDB commands run while handling one request."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.by_command = {}
+
+    def add(self, command, seconds):
+        self.count += 1
+        self.seconds += seconds
+        self.by_command[command] = self.by_command.get(command, 0) + 1
+
+
+# The current request's RequestQueries; None outside requests (background
+# threads), whose commands are only counted globally
+_request_queries = ContextVar("request_queries", default=None)
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Counts and times every MongoDB command, globally and per request."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event, "ok")
+
+    def failed(self, event):
+        self._record(event, "error")
+
+    def _record(self, event, outcome):
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMANDS.labels(event.command_name, outcome).inc()
+        MONGO_COMMAND_LATENCY.labels(event.command_name).observe(seconds)
+        queries = _request_queries.get()
+        if queries is not None:
+            queries.add(event.command_name, seconds)
+
+
+class LogCountHandler(logging.Handler):
+    """Counts warnings and errors so they show up in /metrics."""
+
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+
+    def emit(self, record):
+        LOG_MESSAGES.labels(record.levelname.lower(), record.name).inc()
+
+
+def record_classifier_call(tier, outcome, started=None):
+    """Count a classifier lookup, and its latency if `started` (perf_counter) is given."""
+    CLASSIFIER_CALLS.labels(tier, outcome).inc()
+    if started is not None:
+        CLASSIFIER_LATENCY.labels(tier).observe(time.perf_counter() - started)
+
+
+def _route():
+    # The URL rule, not the path, so ids do not multiply the series
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+
+def _registry():
+    if MULTIPROCESS_DIR:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def metrics_view():
+    """Prometheus text exposition of the metrics above."""
+    if METRICS_TOKEN and request.headers.get("Authorization") != f"Bearer {METRICS_TOKEN}":
+        abort(401)
+    return Response(generate_latest(_registry()), mimetype=CONTENT_TYPE_LATEST)
+
+
+_listener_registered = False
+
+
+def init_metrics(app):
+    """
+    Record request, MongoDB and log metrics for `app` and serve them at
+    GET /metrics. Call before init_compression so sizes are measured
+    after compression, and before the first MongoClient is created.
+    """
+    global _listener_registered
+    if not _listener_registered:
+        # Applies to clients created from now on
+        monitoring.register(CommandMetricsListener())
+        logging.getLogger().addHandler(LogCountHandler())
+        _listener_registered = True
+
+    @app.before_request
+    def start_request_metrics():
+        request.environ["metrics.started"] = time.perf_counter()
+        request.environ["metrics.queries_token"] = _request_queries.set(RequestQueries())
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = request.environ.get("metrics.started")
+        token = request.environ.get("metrics.queries_token")
+        if started is None or token is None:
+            return response
+        route = _route()
+        REQUEST_LATENCY.labels(request.method, route).observe(time.perf_counter() - started)
+        REQUESTS.labels(request.method, route, str(response.status_code)).inc()
+        if response.content_length is not None:
+            RESPONSE_SIZE.labels(route).observe(response.content_length)
+
+        queries = _request_queries.get()
+        _request_queries.reset(token)
+        if queries is not None:
+            REQUEST_MONGO_COMMANDS.labels(route).observe(queries.count)
+            REQUEST_MONGO_TIME.labels(route).observe(queries.seconds)
+            if queries.count > QUERY_BUDGET:
+                QUERY_BUDGET_EXCEEDED.labels(route).inc()
+                logger.warning(
+                    "%s %s ran %d MongoDB commands (budget %d), possible N+1 queries: %s",
+                    request.method, route, queries.count, QUERY_BUDGET, queries.by_command
+                )
+        return response
+
+    app.add_url_rule("/metrics", "metrics", metrics_view, methods=["GET"])
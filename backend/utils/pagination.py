@@ -0,0 +1,89 @@
+# utils/pagination.py
+import base64
+from bson import json_util
+
+# Page size limits for list endpoints
+DEFAULT_PAGE_SIZE = 25
+MAX_PAGE_SIZE = 100
+
+
+def parse_limit(args, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    Read the `limit` query parameter, clamped to [1, maximum].
+
+    Raises:
+        ValueError: If the parameter is not an integer
+    """
+    limit = int(args.get("limit", default))
+    return max(1, min(limit, maximum))
+
+
+def encode_cursor(values):
+    """Encode the sort key values of the last document into an opaque token."""
+    raw = json_util.dumps(values).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """
+    Decode a token produced by encode_cursor.
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        values = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid pagination cursor")
+    if not isinstance(values, list):
+        raise ValueError("Invalid pagination cursor")
+    return values
+
+
+def keyset_filter(sort, values):
+    """
+    Build a filter matching documents strictly after `values` in `sort` order.
+
+    For sort [(a, -1), (b, -1)] this yields
+    {"$or": [{a: {"$lt": va}}, {a: va, b: {"$lt": vb}}]}.
+    """
+    if len(values) != len(sort):
+        raise ValueError("Invalid pagination cursor")
+
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {sort[j][0]: values[j] for j in range(i)}
+        clause[field] = {"$lt" if direction < 0 else "$gt": values[i]}
+        clauses.append(clause)
+    return {"$or": clauses}
+
+
+def paginate(collection, query, sort, limit, cursor=None, projection=None):
+    """
+    Fetch one page of a keyset-paginated query.
+
+    Args:
+        collection: The pymongo collection to query
+        query (dict): The base filter
+        sort (list): (field, direction) pairs; must end with a unique field such as _id
+        limit (int): Page size
+        cursor (str): Token returned as `next` by the previous page, if any
+        projection (dict): Fields to return
+
+    Returns:
+        tuple: (list of documents, next token or None)
+    """
+    if cursor:
+        query = {"$and": [query, keyset_filter(sort, decode_cursor(cursor))]}
+
+    # Fetch one extra document to know whether another page exists
+    docs = list(collection.find(query, projection).sort(sort).limit(limit + 1))
+
+    next_token = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        last = docs[-1]
+        next_token = encode_cursor([last.get(field) for field, _ in sort])
+
+    return docs, next_token
@@ -0,0 +1,138 @@
+# utils/passwords.py
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+
+# bcrypt cost factor for new hashes. Stored hashes with a different cost are
+# rehashed the next time their owner logs in.
+LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", "12"))
+
+# Processes hashing and verifying passwords, per worker. 0 hashes on the
+# request thread (development and tests).
+POOL_SIZE = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+
+# Hash requests queued or running at once; beyond this, callers get
+# PasswordHasherBusy. Each waiting request holds a request thread, so keep
+# this well below the worker's thread count (GUNICORN_THREADS).
+MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", str(max(1, POOL_SIZE) * 2)))
+
+# Longest a request waits for its hash
+TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", "10"))
+
+# bcrypt only uses the first 72 bytes; older bcrypt releases (and the
+# existing hashes) truncate silently, newer ones raise instead
+_MAX_PASSWORD_BYTES = 72
+
+
+class PasswordHasherBusy(Exception):
+    """Too many hashes are already queued; the caller should retry later."""
+
+
+def _encode(password):
+    return password.encode("utf-8")[:_MAX_PASSWORD_BYTES]
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def _verify(password, hashed):
+    try:
+        return bcrypt.checkpw(_encode(password), hashed.encode("utf-8"))
+    except ValueError:
+        # Not a bcrypt hash
+        return False
+
+
+def hash_cost(hashed):
+    """The cost factor of a stored bcrypt hash ("$2b$12$..."), or None."""
+    try:
+        return int(hashed.split("$")[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def needs_rehash(hashed):
+    return hash_cost(hashed) != LOG_ROUNDS
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt in a small process pool, off the request threads.
+
+    A login storm then occupies PASSWORD_HASH_WORKERS cores rather than
+    every request thread, and once MAX_PENDING hashes are waiting further
+    requests are refused at once instead of queueing behind them.
+    """
+
+    def __init__(self, pool_size, max_pending):
+        self.pool_size = pool_size
+        self.max_pending = max_pending
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # forkserver children start clean instead of copying a
+                    # worker's threads and Mongo client
+                    methods = multiprocessing.get_all_start_methods()
+                    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                    self._executor = ProcessPoolExecutor(max_workers=self.pool_size, mp_context=context)
+        return self._executor
+
+    def _run(self, fn, *args):
+        if self.pool_size <= 0:
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy()
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        try:
+            return future.result(timeout=TIMEOUT_SECONDS)
+        except TimeoutError:
+            raise PasswordHasherBusy()
+        except BrokenProcessPool:
+            # A pool process died; start a fresh pool for the next caller
+            with self._lock:
+                self._executor = None
+            raise
+
+    def hash_password(self, password):
+        """
+        Hash `password` with the configured cost.
+
+        Raises:
+            PasswordHasherBusy: If MAX_PENDING hashes are already queued
+        """
+        return self._run(_hash, password, LOG_ROUNDS)
+
+    def verify_password(self, password, hashed):
+        """
+        Check `password` against a stored hash.
+
+        Raises:
+            PasswordHasherBusy: If MAX_PENDING hashes are already queued
+        """
+        return self._run(_verify, password, hashed)
+
+    def _after_fork(self):
+        # The pool's processes and threads belong to the parent
+        self._executor = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+
+
+password_hasher = PasswordHasher(POOL_SIZE, MAX_PENDING)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=password_hasher._after_fork)
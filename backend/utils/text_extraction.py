@@ -0,0 +1,100 @@
+# utils/text_extraction.py
+import logging
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+from database.db import get_db
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the document text stored on a case for search
+MAX_CASE_TEXT_CHARS = int(os.getenv("SEARCH_MAX_DOCUMENT_CHARS", "100000"))
+
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_WHITESPACE = re.compile(r"\s+")
+
+# Extraction runs off the request thread
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="text-extraction")
+
+
+def _reset_executor():
+    # An executor inherited through fork has no threads in the child
+    global _executor
+    _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="text-extraction")
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_executor)
+
+
+def extract_text(path, filename):
+    """
+    Extract plain text from a PDF or DOCX file. Other types yield "".
+
+    PDF support needs the optional pypdf package; without it PDFs are skipped.
+    """
+    extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    try:
+        if extension == "docx":
+            return _extract_docx(path)
+        if extension == "pdf":
+            return _extract_pdf(path)
+    except Exception:
+        logger.exception("Error extracting text from %s", filename)
+    return ""
+
+
+def _extract_docx(path):
+    with zipfile.ZipFile(path) as archive:
+        root = ElementTree.fromstring(archive.read("word/document.xml"))
+    paragraphs = []
+    for paragraph in root.iter(f"{_WORD_NS}p"):
+        paragraphs.append("".join(node.text or "" for node in paragraph.iter(f"{_WORD_NS}t")))
+    return "\n".join(p for p in paragraphs if p)
+
+
+def _extract_pdf(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return ""
+    reader = PdfReader(path)
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def document_text(db, document):
+    """
+    Text of one stored document. Results are kept on the document_blobs entry,
+    so content shared by several cases is only extracted once.
+    """
+    sha256 = document.get("sha256")
+    if sha256:
+        blob = db.document_blobs.find_one({"_id": sha256}, {"text": 1})
+        if blob and "text" in blob:
+            return blob["text"]
+
+    text = _WHITESPACE.sub(" ", extract_text(document["path"], document["filename"])).strip()
+    text = text[:MAX_CASE_TEXT_CHARS]
+    if sha256:
+        db.document_blobs.update_one({"_id": sha256}, {"$set": {"text": text}})
+    return text
+
+
+def index_case_documents(db, case_id, documents):
+    """Store the combined text of a case's documents in its documentsText field."""
+    texts = [document_text(db, document) for document in documents]
+    combined = "\n".join(t for t in texts if t)[:MAX_CASE_TEXT_CHARS]
+    db.cases.update_one({"_id": case_id}, {"$set": {"documentsText": combined}})
+
+
+def index_case_documents_async(case_id, documents):
+    """Queue index_case_documents on the background executor."""
+    def run():
+        try:
+            index_case_documents(get_db(), case_id, documents)
+        except Exception:
+            logger.exception("Error indexing documents for case %s", case_id)
+
+    _executor.submit(run)
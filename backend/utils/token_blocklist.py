@@ -0,0 +1,70 @@
+# utils/token_blocklist.py
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+class RevokedTokenCache:
+    """
+    In-process copy of the revoked_tokens collection.
+
+    Every unexpired revoked JTI is held in memory, so both positive and
+    negative lookups are answered without a database round trip. New
+    revocations from other workers are picked up by polling for documents
+    created after the last one seen, at most once per `poll_interval`
+    seconds, which bounds how long a logout takes to apply everywhere.
+    """
+
+    def __init__(self, poll_interval=5.0, max_token_lifetime=timedelta(days=30)):
+        self.poll_interval = poll_interval
+        self.max_token_lifetime = max_token_lifetime
+        self._revoked = {}  # jti -> expiry datetime
+        self._high_water = None
+        self._last_poll = None
+        self._lock = threading.Lock()
+
+    def configure(self, poll_interval, max_token_lifetime):
+        self.poll_interval = poll_interval
+        self.max_token_lifetime = max_token_lifetime
+
+    def add(self, jti, expires_at):
+        """Record a token revoked by this worker so it applies immediately."""
+        with self._lock:
+            self._revoked[jti] = expires_at
+
+    def is_revoked(self, db, jti):
+        now = time.monotonic()
+        if self._last_poll is None or now - self._last_poll >= self.poll_interval:
+            with self._lock:
+                if self._last_poll is None or now - self._last_poll >= self.poll_interval:
+                    self._refresh(db)
+                    self._last_poll = now
+        return jti in self._revoked
+
+    def _refresh(self, db):
+        now = datetime.utcnow()
+        if self._high_water is None:
+            since = now - self.max_token_lifetime
+        else:
+            # Overlap the previous poll to tolerate clock skew between workers
+            since = self._high_water - timedelta(seconds=max(self.poll_interval, 1) * 2)
+
+        docs = db.revoked_tokens.find(
+            {"created_at": {"$gt": since}},
+            {"_id": 0, "jti": 1, "created_at": 1, "expires_at": 1}
+        )
+        for doc in docs:
+            expires_at = doc.get("expires_at") or doc["created_at"] + self.max_token_lifetime
+            if expires_at > now:
+                self._revoked[doc["jti"]] = expires_at
+            if self._high_water is None or doc["created_at"] > self._high_water:
+                self._high_water = doc["created_at"]
+
+        if self._high_water is None:
+            self._high_water = since
+
+        # Tokens past their expiry are rejected by the JWT check anyway
+        self._revoked = {jti: exp for jti, exp in self._revoked.items() if exp > now}
+
+
+revoked_token_cache = RevokedTokenCache()
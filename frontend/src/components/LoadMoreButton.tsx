@@ -0,0 +1,33 @@
+import React from "react";
+import { Loader2 } from "lucide-react";
+
+interface LoadMoreButtonProps {
+  hasMore: boolean;
+  loading: boolean;
+  onClick: () => void;
+}
+
+// Case lists are paginated by the API (a page plus a `next` cursor);
+// this fetches the following page and is hidden once there is none
+export const LoadMoreButton = ({ hasMore, loading, onClick }: LoadMoreButtonProps) => {
+  if (!hasMore) return null;
+
+  return (
+    <div className="flex justify-center">
+      <button
+        onClick={onClick}
+        disabled={loading}
+        className="px-4 py-2 bg-white text-gray-900 text-sm font-medium rounded-md border border-gray-300 shadow-sm hover:bg-gray-50 disabled:cursor-not-allowed disabled:opacity-60 flex items-center"
+      >
+        {loading ? (
+          <>
+            <Loader2 className="h-4 w-4 mr-2 animate-spin" />
+            Loading...
+          </>
+        ) : (
+          "Load more"
+        )}
+      </button>
+    </div>
+  );
+};
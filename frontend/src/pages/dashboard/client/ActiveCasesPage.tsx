@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
 import { CaseCard, type CaseCardProps } from "../../../components/CaseCard";
+import { LoadMoreButton } from "../../../components/LoadMoreButton";
 import { useAuth } from "../../../contexts/AuthContext";
 import { 
   Loader2, 
@@ -34,6 +35,7 @@ interface ApiCase {
   documents?: Array<{
     filename: string;
     path: string;
+    sha256?: string;
     uploadedAt: string;
   }>;
   comments?: Array<{
@@ -56,6 +58,22 @@ export const ActiveCasesPage = () => {
   const [loadingDetail, setLoadingDetail] = useState<boolean>(false);
   const [comment, setComment] = useState<string>("");
   const [submittingComment, setSubmittingComment] = useState<boolean>(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
+
+  // Transform an API case to match CaseCardProps format
+  const formatCase = (caseData: ApiCase): CaseCardProps => ({
+    id: caseData._id,
+    title: caseData.title,
+    description: caseData.description,
+    status: formatStatus(caseData.status),
+    lastUpdated: caseData.updated_at,
+    lawyer: caseData.assignedLawyer ? {
+      name: caseData.assignedLawyer.name
+    } : undefined,
+    category: caseData.category,
+    urgencyLevel: caseData.urgencyLevel
+  });
 
   // Fetch cases from the API
   useEffect(() => {
@@ -67,21 +85,8 @@ export const ActiveCasesPage = () => {
         const response = await api.get('/cases/client/cases');
         
         if (response.data && response.data.cases) {
-          // Transform API response to match CaseCardProps format
-          const formattedCases: CaseCardProps[] = response.data.cases.map((caseData: ApiCase) => ({
-            id: caseData._id,
-            title: caseData.title,
-            description: caseData.description,
-            status: formatStatus(caseData.status),
-            lastUpdated: caseData.updated_at,
-            lawyer: caseData.assignedLawyer ? {
-              name: caseData.assignedLawyer.name
-            } : undefined,
-            category: caseData.category,
-            urgencyLevel: caseData.urgencyLevel
-          }));
-          
-          setCases(formattedCases);
+          setCases(response.data.cases.map(formatCase));
+          setNextCursor(response.data.next || null);
         } else {
           // Handle unexpected response format
           console.error("Unexpected API response format:", response);
@@ -107,6 +112,23 @@ export const ActiveCasesPage = () => {
     fetchCases();
   }, [api, selectedCase]);
 
+  // Fetch the page after the last one shown and append it
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    
+    try {
+      setLoadingMore(true);
+      const response = await api.get('/cases/client/cases', { params: { next: nextCursor } });
+      setCases(prevCases => [...prevCases, ...response.data.cases.map(formatCase)]);
+      setNextCursor(response.data.next || null);
+    } catch (err) {
+      console.error("Error loading more cases:", err);
+      toast.error("Failed to load more cases. Please try again.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Fetch case detail when a case is selected
   useEffect(() => {
     const fetchCaseDetail = async () => {
@@ -210,8 +232,15 @@ export const ActiveCasesPage = () => {
   };
 
   // Handle downloads (this would need to be implemented on the backend)
-  const handleDownload = (filePath: string, filename: string) => {
-    window.open(`${API_BASE_URL}/documents/download?path=${encodeURIComponent(filePath)}`, '_blank');
+  // Documents are addressed by case and content hash (index for older uploads);
+  // a new tab cannot send the Authorization header, so the token goes in ?jwt=
+  const handleDownload = (documentRef: string) => {
+    if (!selectedCase) return;
+    const token = localStorage.getItem('accessToken') || '';
+    window.open(
+      `${API_BASE_URL}/documents/case/${selectedCase}/${encodeURIComponent(documentRef)}?jwt=${encodeURIComponent(token)}`,
+      '_blank'
+    );
   };
 
   // Handle submitting a comment
@@ -402,7 +431,7 @@ export const ActiveCasesPage = () => {
                             </div>
                           </div>
                           <button 
-                            onClick={() => handleDownload(doc.path, doc.filename)}
+                            onClick={() => handleDownload(doc.sha256 || String(index))}
                             className="p-2 text-blue-600 hover:text-blue-800 rounded-full hover:bg-blue-50"
                           >
                             <Download className="h-5 w-5" />
@@ -582,6 +611,8 @@ export const ActiveCasesPage = () => {
           />
         ))}
       </div>
+      
+      <LoadMoreButton hasMore={!!nextCursor} loading={loadingMore} onClick={handleLoadMore} />
     </div>
   );
 };
@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
 import { CaseCard, type CaseCardProps } from "../../../components/CaseCard";
+import { LoadMoreButton } from "../../../components/LoadMoreButton";
 import { useAuth } from "../../../contexts/AuthContext";
 import { 
   Loader2, 
@@ -35,6 +36,7 @@ interface ApiAssignedCase {
   documents?: Array<{
     filename: string;
     path: string;
+    sha256?: string;
     uploadedAt: string;
   }>;
   comments?: Array<{
@@ -67,6 +69,20 @@ export const AssignedCasesPage = () => {
   const [newStatus, setNewStatus] = useState<string>("");
   const [comment, setComment] = useState<string>("");
   const [updating, setUpdating] = useState<boolean>(false);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
+
+  // Transform an API case to match CaseCardProps format
+  const formatCase = (caseData: ApiAssignedCase): CaseCardProps => ({
+    id: caseData._id,
+    title: caseData.title,
+    description: caseData.description,
+    status: formatStatus(caseData.status),
+    lastUpdated: caseData.updated_at,
+    category: caseData.category,
+    urgencyLevel: caseData.urgencyLevel,
+    client: caseData.client
+  });
 
   // Fetch assigned cases from the API
   useEffect(() => {
@@ -78,19 +94,8 @@ export const AssignedCasesPage = () => {
         const response = await api.get('/lawyer/cases/assigned-cases');
         
         if (response.data && response.data.cases) {
-          // Transform API response to match CaseCardProps format
-          const formattedCases: CaseCardProps[] = response.data.cases.map((caseData: ApiAssignedCase) => ({
-            id: caseData._id,
-            title: caseData.title,
-            description: caseData.description,
-            status: formatStatus(caseData.status),
-            lastUpdated: caseData.updated_at,
-            category: caseData.category,
-            urgencyLevel: caseData.urgencyLevel,
-            client: caseData.client
-          }));
-          
-          setAssignedCases(formattedCases);
+          setAssignedCases(response.data.cases.map(formatCase));
+          setNextCursor(response.data.next || null);
         } else {
           // Fall back to mock data if the API doesn't return the expected format
           console.warn("API returned unexpected format, using mock data");
@@ -110,6 +115,23 @@ export const AssignedCasesPage = () => {
     fetchAssignedCases();
   }, [api, selectedCase]);
 
+  // Fetch the page after the last one shown and append it
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    
+    try {
+      setLoadingMore(true);
+      const response = await api.get('/lawyer/cases/assigned-cases', { params: { next: nextCursor } });
+      setAssignedCases(prevCases => [...prevCases, ...response.data.cases.map(formatCase)]);
+      setNextCursor(response.data.next || null);
+    } catch (err) {
+      console.error("Error loading more cases:", err);
+      toast.error("Failed to load more cases. Please try again.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Fetch case detail when a case is selected
   useEffect(() => {
     const fetchCaseDetail = async () => {
@@ -278,8 +300,15 @@ export const AssignedCasesPage = () => {
   });
 
   // Handle downloads (this would need to be implemented on the backend)
-  const handleDownload = (filePath: string, filename: string) => {
-    window.open(`${API_BASE_URL}/documents/download?path=${encodeURIComponent(filePath)}`, '_blank');
+  // Documents are addressed by case and content hash (index for older uploads);
+  // a new tab cannot send the Authorization header, so the token goes in ?jwt=
+  const handleDownload = (documentRef: string) => {
+    if (!selectedCase) return;
+    const token = localStorage.getItem('accessToken') || '';
+    window.open(
+      `${API_BASE_URL}/documents/case/${selectedCase}/${encodeURIComponent(documentRef)}?jwt=${encodeURIComponent(token)}`,
+      '_blank'
+    );
   };
 
   // Empty state - no cases
@@ -434,7 +463,7 @@ export const AssignedCasesPage = () => {
                             </div>
                           </div>
                           <button 
-                            onClick={() => handleDownload(doc.path, doc.filename)}
+                            onClick={() => handleDownload(doc.sha256 || String(index))}
                             className="p-2 text-blue-600 hover:text-blue-800 rounded-full hover:bg-blue-50"
                           >
                             <Download className="h-5 w-5" />
@@ -638,6 +667,8 @@ export const AssignedCasesPage = () => {
           ))}
         </div>
       )}
+      
+      <LoadMoreButton hasMore={!!nextCursor} loading={loadingMore} onClick={handleLoadMore} />
     </div>
   );
 };
@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
 import { CaseCard, type CaseCardProps } from "../../../components/CaseCard";
+import { LoadMoreButton } from "../../../components/LoadMoreButton";
 import { useAuth } from "../../../contexts/AuthContext";
 import { Loader2, Filter } from "lucide-react";
 import { toast } from "sonner";
@@ -27,6 +28,20 @@ export const AvailableCasesPage = () => {
   const [loading, setLoading] = useState<boolean>(true);
   const [error, setError] = useState<string | null>(null);
   const [filter, setFilter] = useState<string>("all");
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState<boolean>(false);
+
+  // Transform an API case to match CaseCardProps format
+  const formatCase = (caseData: ApiAvailableCase): CaseCardProps => ({
+    id: caseData._id,
+    title: caseData.title,
+    description: caseData.description,
+    status: "Pending",
+    lastUpdated: caseData.updated_at,
+    category: caseData.category,
+    urgencyLevel: caseData.urgencyLevel,
+    client: caseData.client
+  });
 
   // Fetch available cases from the API
   useEffect(() => {
@@ -36,19 +51,8 @@ export const AvailableCasesPage = () => {
         const response = await api.get('/lawyer/cases/available-cases');
         
         if (response.data && response.data.cases) {
-          // Transform API response to match CaseCardProps format
-          const formattedCases: CaseCardProps[] = response.data.cases.map((caseData: ApiAvailableCase) => ({
-            id: caseData._id,
-            title: caseData.title,
-            description: caseData.description,
-            status: "Pending",
-            lastUpdated: caseData.updated_at,
-            category: caseData.category,
-            urgencyLevel: caseData.urgencyLevel,
-            client: caseData.client
-          }));
-          
-          setAvailableCases(formattedCases);
+          setAvailableCases(response.data.cases.map(formatCase));
+          setNextCursor(response.data.next || null);
         } else {
           // Fall back to mock data if the API doesn't return the expected format
           console.warn("API returned unexpected format, using mock data");
@@ -70,6 +74,23 @@ export const AvailableCasesPage = () => {
     fetchAvailableCases();
   }, [api]);
 
+  // Fetch the page after the last one shown and append it
+  const handleLoadMore = async () => {
+    if (!nextCursor) return;
+    
+    try {
+      setLoadingMore(true);
+      const response = await api.get('/lawyer/cases/available-cases', { params: { next: nextCursor } });
+      setAvailableCases(prevCases => [...prevCases, ...response.data.cases.map(formatCase)]);
+      setNextCursor(response.data.next || null);
+    } catch (err) {
+      console.error("Error loading more cases:", err);
+      toast.error("Failed to load more cases. Please try again.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // Handle accepting a case
   const handleAcceptCase = async (caseId: string) => {
     try {
@@ -234,6 +255,8 @@ export const AvailableCasesPage = () => {
           ))}
         </div>
       )}
+      
+      <LoadMoreButton hasMore={!!nextCursor} loading={loadingMore} onClick={handleLoadMore} />
     </div>
   );
 };